@@ -15,18 +15,41 @@
 from __future__ import annotations
 from pathlib import Path
 from datetime import datetime, timedelta
+from functools import lru_cache
 import calendar
+import csv
+import io
+import os
+import re
 import pandas as pd
 
-LOGS_DIR = Path("logs")
+from .store import LOGS_DIR, log_name
+
 LOGS_DIR.mkdir(exist_ok=True)
 
 # --------------------------- Generic helpers --------------------------------
 
+# Above this size _save_df falls back to DataFrame.to_csv
+_CSV_FAST_MAX_ROWS = 10_000
+
+def _log_path(kind: str, year: int, month: int) -> Path:
+    """Path of a monthly log, e.g. logs/ship_status_2025_09.csv."""
+    return LOGS_DIR / log_name(kind, year, month)
+
+@lru_cache(maxsize=128)
+def _load_cached(path_str: str, mtime_ns: int) -> pd.DataFrame:
+    """Parse a log CSV once per (path, mtime); never mutate the result."""
+    # na_filter=False: blanks come back as "" directly (and "NA" stays "NA")
+    return pd.read_csv(path_str, dtype=str, na_filter=False, keep_default_na=False)
+
+def _read_log_csv(path: Path) -> pd.DataFrame:
+    """Return a private copy of the (cached) parsed CSV."""
+    return _load_cached(str(path), path.stat().st_mtime_ns).copy()
+
 def _canon_df(path: Path, columns: list[str]) -> pd.DataFrame:
     """Load CSV and ensure exactly these columns/order."""
     if path.exists():
-        df = pd.read_csv(path, dtype=str).fillna("")
+        df = _read_log_csv(path)
         df = df[[c for c in df.columns if c in columns]]
     else:
         df = pd.DataFrame(columns=columns)
@@ -36,36 +59,81 @@ def _canon_df(path: Path, columns: list[str]) -> pd.DataFrame:
     df = df[columns]
     return df
 
-def _save_df(path: Path, df: pd.DataFrame, columns: list[str]) -> None:
-    """Write CSV with exact columns/order (utf-8-sig)."""
-    out = df.copy()
-    for c in columns:
-        if c not in out.columns:
-            out[c] = ""
-    out = out[columns].fillna("")
+def _save_df(path: Path, df: pd.DataFrame, columns: list[str], encoding: str = "utf-8") -> None:
+    """Write CSV with exact columns/order (plain UTF-8; pass "utf-8-sig" for Excel-facing files)."""
+    out = df.reindex(columns=columns, fill_value="")
     path.parent.mkdir(parents=True, exist_ok=True)
-    out.to_csv(path, index=False, encoding="utf-8-sig")
+    buf = io.StringIO()
+    if len(out) <= _CSV_FAST_MAX_ROWS:
+        # Small logs: the stdlib writer skips pandas' formatter setup
+        w = csv.writer(buf, lineterminator="\n")
+        w.writerow(columns)
+        w.writerows(out.itertuples(index=False, name=None))
+    else:
+        out.to_csv(buf, index=False, lineterminator="\n")
+    # One buffered write to a temp file, then an atomic rename over the log
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("w", newline="", encoding=encoding) as f:
+        f.write(buf.getvalue())
+    os.replace(tmp, path)
+    _load_cached.cache_clear()
+    _existing_keys.cache_clear()
+
+def _row_set(df: pd.DataFrame, columns: list[str]) -> set[tuple]:
+    """Set of row tuples over the given columns (for duplicate checks)."""
+    return set(zip(*(df[c].to_numpy(dtype=object) for c in columns)))
+
+@lru_cache(maxsize=128)
+def _existing_keys(path_str: str, mtime_ns: int, columns: tuple[str, ...]) -> frozenset:
+    """Composite-key set of a log file, cached per (path, mtime)."""
+    return frozenset(_row_set(_canon_df(Path(path_str), list(columns)), list(columns)))
+
+def _existing_set(path: Path, columns: list[str]) -> frozenset:
+    """Rows already on disk for the given columns (empty if no file)."""
+    if not path.exists():
+        return frozenset()
+    return _existing_keys(str(path), path.stat().st_mtime_ns, tuple(columns))
+
+def _append_rows(df: pd.DataFrame, rows: list[tuple], columns: list[str]) -> pd.DataFrame:
+    """Append new rows in one concat (avoids per-row df.loc growth)."""
+    if not rows:
+        return df
+    new = pd.DataFrame(rows, columns=columns)
+    if df.empty:
+        return new
+    return pd.concat([df, new], ignore_index=True)
+
+def _save_new_rows(path: Path, df: pd.DataFrame, rows: list[tuple], columns: list[str]) -> None:
+    """Append the rows not yet in the log and save it; an existing log is not rewritten when none is new."""
+    existing = _existing_set(path, columns)
+    fresh = [r for r in rows if r not in existing]
+    if fresh or not path.exists():
+        _save_df(path, _append_rows(df, fresh, columns), columns)
+
+# One comma-separated token: a day ("5") or an inclusive range ("5-7"); a leading
+# "+" on either number is accepted, as int() accepts it
+_DAY_TOKEN_RE = re.compile(r"\s*\+?(\d+)\s*(?:-\s*\+?(\d+)\s*)?")
 
 def _parse_days_list(days_text: str) -> list[int]:
     """Parse '1, 2, 5-7' → [1,2,5,6,7]."""
     if not days_text:
         return []
-    out = []
-    parts = [p.strip() for p in days_text.split(",")]
-    for p in parts:
-        if "-" in p:
-            a, b = p.split("-", 1)
-            try:
-                a, b = int(a.strip()), int(b.strip())
-                out.extend(list(range(min(a,b), max(a,b)+1)))
-            except ValueError:
-                continue
-        else:
-            try:
-                out.append(int(p))
-            except ValueError:
-                continue
-    return sorted(set(out))
+    out = set()
+    for part in days_text.split(","):
+        m = _DAY_TOKEN_RE.fullmatch(part)
+        if not m:
+            continue
+        a = int(m.group(1))
+        b = int(m.group(2)) if m.group(2) else a
+        out.update(range(min(a, b), max(a, b) + 1))
+    return sorted(out)
+
+def _month_isos(year: int, month: int, days: list[int]) -> list[str]:
+    """ISO dates for the given day numbers; days outside the month are dropped."""
+    if not 1 <= month <= 12:
+        return []
+    _, last = calendar.monthrange(year, month)
+    return [f"{year:04d}-{month:02d}-{d:02d}" for d in days if 1 <= d <= last]
 
 def _daterange(start_iso: str, end_iso: str):
     """Yield YYYY-MM-DD from start to end inclusive."""
@@ -79,72 +147,75 @@ def _daterange(start_iso: str, end_iso: str):
 # ---------------------------- Ship status -----------------------------------
 
 def clear_ship_status(year: int, month: int) -> str:
-    path = LOGS_DIR / f"ship_status_{year:04d}_{month:02d}.csv"
+    path = _log_path("ship_status", year, month)
     if path.exists():
         path.unlink()
+        _load_cached.cache_clear()
+        _existing_keys.cache_clear()
     return "✅ Cleared ship status for the month."
 
-def set_ship_status_bulk(year: int, month: int, days: str, status: str) -> str:
-    """Set ship status for given days of a month ('in port' or 'at sea')."""
-    path = LOGS_DIR / f"ship_status_{year:04d}_{month:02d}.csv"
-    cols = ["date", "status"]
-    df = _canon_df(path, cols)
-
+def _set_ship_status_days(year: int, month: int, dlist: list[int], status: str) -> str:
+    """Set ship status for already-parsed day numbers (no string round-trip)."""
     valid = {"in port", "at sea"}
     if status not in valid:
         return "❌ Error: Invalid ship status."
-
-    dlist = _parse_days_list(days)
     if not dlist:
         return "❌ Error: No days provided."
 
-    # index map
-    existing = {r["date"]: i for i, r in enumerate(df.to_dict("records"))}
-    for d in dlist:
-        try:
-            day_iso = datetime(year, month, d).date().isoformat()
-        except ValueError:
-            continue
-        if day_iso in existing:
-            idx = existing[day_iso]
-            df.at[idx, "status"] = status
-        else:
-            df.loc[len(df)] = [day_iso, status]
-            existing[day_iso] = len(df) - 1
+    path = _log_path("ship_status", year, month)
+    cols = ["date", "status"]
+    df = _canon_df(path, cols)
+
+    day_isos = _month_isos(year, month, dlist)
+
+    # Update known dates in one vectorized assignment, append the rest
+    mask = df["date"].isin(day_isos)
+    df.loc[mask, "status"] = status
+    known = set(df["date"])
+    df = _append_rows(df, [(d, status) for d in day_isos if d not in known], cols)
 
     _save_df(path, df, cols)
     return "✅ Ship status updated for selected days."
 
-# Quick month patterns
+def set_ship_status_bulk(year: int, month: int, days: str, status: str) -> str:
+    """Set ship status for given days of a month ('in port' or 'at sea')."""
+    return _set_ship_status_days(year, month, _parse_days_list(days), status)
+
+def _month_days(year: int, month: int) -> pd.DatetimeIndex:
+    """All calendar days of the month."""
+    _, last = calendar.monthrange(year, month)
+    return pd.date_range(f"{year:04d}-{month:02d}-01", periods=last, freq="D")
+
+def _write_ship_status(year: int, month: int, mapping: dict[str, str]) -> None:
+    """Overwrite the month's ship status file in one write (date → status)."""
+    path = _log_path("ship_status", year, month)
+    cols = ["date", "status"]
+    _save_df(path, pd.DataFrame(list(mapping.items()), columns=cols), cols)
+
+# Quick month patterns (each replaces the whole month in a single write)
 def set_month_weekdays_in_port(year: int, month: int) -> str:
     """Mon-Fri = 'in port', Sat/Sun = 'at sea'."""
-    clear_ship_status(year, month)
-    _, last = calendar.monthrange(year, month)
-    in_port = ",".join(str(d) for d in range(1, last+1)
-                       if datetime(year, month, d).weekday() < 5)
-    at_sea  = ",".join(str(d) for d in range(1, last+1)
-                       if datetime(year, month, d).weekday() >= 5)
-    msg1 = set_ship_status_bulk(year, month, in_port, "in port")
-    msg2 = set_ship_status_bulk(year, month, at_sea, "at sea")
-    return msg1 + "\n" + msg2
+    days = _month_days(year, month)
+    status = ["in port" if wd < 5 else "at sea" for wd in days.dayofweek]
+    _write_ship_status(year, month, dict(zip(days.strftime("%Y-%m-%d"), status)))
+    msg = "✅ Ship status updated for selected days."
+    return msg + "\n" + msg
 
 def set_month_all_in_port(year: int, month: int) -> str:
-    clear_ship_status(year, month)
-    _, last = calendar.monthrange(year, month)
-    days = ",".join(str(d) for d in range(1, last+1))
-    return set_ship_status_bulk(year, month, days, "in port")
+    days = _month_days(year, month).strftime("%Y-%m-%d")
+    _write_ship_status(year, month, dict.fromkeys(days, "in port"))
+    return "✅ Ship status updated for selected days."
 
 def set_month_all_at_sea(year: int, month: int) -> str:
-    clear_ship_status(year, month)
-    _, last = calendar.monthrange(year, month)
-    days = ",".join(str(d) for d in range(1, last+1))
-    return set_ship_status_bulk(year, month, days, "at sea")
+    days = _month_days(year, month).strftime("%Y-%m-%d")
+    _write_ship_status(year, month, dict.fromkeys(days, "at sea"))
+    return "✅ Ship status updated for selected days."
 
 # ------------------------------- Holidays -----------------------------------
 
 def add_holiday(year: int, month: int, day: int, description: str) -> str:
     """Add a holiday; idempotent for the same date/description."""
-    path = LOGS_DIR / f"holidays_{year:04d}_{month:02d}.csv"
+    path = _log_path("holidays", year, month)
     cols = ["date", "description"]
     df = _canon_df(path, cols)
     try:
@@ -162,7 +233,7 @@ def add_holiday(year: int, month: int, day: int, description: str) -> str:
 def add_leave(registry_number: str, leave_type: str, start_iso: str, end_iso: str, comments: str = "") -> str:
     """Add leave for a person; expands range into daily rows."""
     year, month = int(start_iso[:4]), int(start_iso[5:7])
-    path = LOGS_DIR / f"daily_leave_{year:04d}_{month:02d}.csv"
+    path = _log_path("daily_leave", year, month)
     cols = ["date", "registry_id", "leave_type", "comments"]
     df = _canon_df(path, cols)
     try:
@@ -173,48 +244,29 @@ def add_leave(registry_number: str, leave_type: str, start_iso: str, end_iso: st
     except Exception:
         return "❌ Error: Invalid leave date range."
 
-    existing = set(tuple(r) for r in df[cols].itertuples(index=False, name=None))
-    for day_iso in _daterange(s.isoformat(), e.isoformat()):
-        row = (day_iso, registry_number, leave_type, comments)
-        if row not in existing:
-            df.loc[len(df)] = list(row)
-    _save_df(path, df, cols)
+    new_rows = [(day_iso, registry_number, leave_type, comments)
+                for day_iso in _daterange(s.isoformat(), e.isoformat())]
+    _save_new_rows(path, df, new_rows, cols)
     return "✅ The leave was registered and the monthly files were updated."
 
 def add_unavailable(registry_number: str, year: int, month: int, days: str, remarks: str = "") -> str:
-    path = LOGS_DIR / f"daily_cannot_{year:04d}_{month:02d}.csv"
+    path = _log_path("daily_cannot", year, month)
     cols = ["date", "registry_id", "comments"]
     df = _canon_df(path, cols)
     dlist = _parse_days_list(days)
     if not dlist:
         return "❌ Error: No days provided."
-    existing = set(tuple(r) for r in df[cols].itertuples(index=False, name=None))
-    for d in dlist:
-        try:
-            day_iso = datetime(year, month, d).date().isoformat()
-        except ValueError:
-            continue
-        row = (day_iso, registry_number, remarks)
-        if row not in existing:
-            df.loc[len(df)] = list(row)
-    _save_df(path, df, cols)
+    new_rows = [(day_iso, registry_number, remarks) for day_iso in _month_isos(year, month, dlist)]
+    _save_new_rows(path, df, new_rows, cols)
     return "✅ The unavailabilities for the selected days were registered."
 
 def add_preference(registry_number: str, year: int, month: int, days: str, remarks: str = "") -> str:
-    path = LOGS_DIR / f"daily_prefer_{year:04d}_{month:02d}.csv"
+    path = _log_path("daily_prefer", year, month)
     cols = ["date", "registry_id", "comments"]
     df = _canon_df(path, cols)
     dlist = _parse_days_list(days)
     if not dlist:
         return "❌ Error: No days provided."
-    existing = set(tuple(r) for r in df[cols].itertuples(index=False, name=None))
-    for d in dlist:
-        try:
-            day_iso = datetime(year, month, d).date().isoformat()
-        except ValueError:
-            continue
-        row = (day_iso, registry_number, remarks)
-        if row not in existing:
-            df.loc[len(df)] = list(row)
-    _save_df(path, df, cols)
+    new_rows = [(day_iso, registry_number, remarks) for day_iso in _month_isos(year, month, dlist)]
+    _save_new_rows(path, df, new_rows, cols)
     return "✅ The preferences for the selected days were registered."
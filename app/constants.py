@@ -9,6 +9,14 @@ RANKS = [
     "Warrant Officer", "Chief Petty Officer", "Senior Petty Officer", "Petty Officer", "Seaman", "Sailor"
 ]
 
+# Officer ranks (Commander down to Ensign, including the (M)/(E) variants)
+OFFICER_RANKS = frozenset({
+    "Commander", "Commander (M)",
+    "Lieutenant Commander", "Lieutenant Commander (M)",
+    "Lieutenant", "Lieutenant (M)", "Lieutenant (E)",
+    "Ensign", "Ensign (M)", "Ensign (E)"
+})
+
 SPECIALTIES = [
     "FW", "EW/DB", "EW/RE", "EW/AS", "EW/SN",
     "ENG", "ELEC", "COOL", "ARM", "ADMIN", "SEA",
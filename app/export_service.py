@@ -5,36 +5,46 @@
 #   2) Monthly overview Excel (Daily Overview + detail sheets)
 #      + NEW: "Leaves (From-To)" sheet that compresses daily leave rows to ranges
 #
-# Requirements: pandas, openpyxl
+# Requirements: pandas, xlsxwriter (openpyxl only for reading .xlsx)
 # -----------------------------------------------------------------------------
 
 from __future__ import annotations
 
+import io
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
+import numpy as np
 import pandas as pd
-from openpyxl.utils import get_column_letter
 
 from .personnel_service import list_personnel, _is_officer
+from .calendar_service import _read_log_csv
+from .store import LOGS_DIR, log_name
 
 # --------------------------- Helpers (formatting) ----------------------------
 
-def _autofit_worksheet(ws):
-    """Auto-fit column widths based on content length (capped)."""
-    for col_idx, col in enumerate(ws.columns, start=1):
-        max_len = 0
-        for cell in col:
-            v = cell.value
-            if v is None:
-                continue
-            max_len = max(max_len, len(str(v)))
-        ws.column_dimensions[get_column_letter(col_idx)].width = min(max_len + 2, 60)
-
-def _freeze_and_fit(ws):
-    """Freeze header row, add filter, and auto-fit columns."""
-    ws.freeze_panes = "A2"
-    ws.auto_filter.ref = ws.dimensions
-    _autofit_worksheet(ws)
+def _column_widths(df: pd.DataFrame) -> list[int]:
+    """Column widths from header/content length (capped), computed on the DataFrame."""
+    widths = []
+    for c in df.columns:
+        lens = df[c].dropna().astype(str).str.len()
+        longest = max(len(str(c)), int(lens.max()) if len(lens) else 0)
+        widths.append(min(longest + 2, 60))
+    return widths
+
+def _autofit_xlsx(ws, *frames: pd.DataFrame):
+    """Auto-fit column widths from the DataFrames written to the sheet (capped)."""
+    widths = {}
+    for df in frames:
+        for i, w in enumerate(_column_widths(df)):
+            widths[i] = max(widths.get(i, 0), w)
+    for i, w in widths.items():
+        ws.set_column(i, i, w)
+
+def _freeze_and_fit_xlsx(ws, df: pd.DataFrame):
+    """Freeze header row, add filter, and auto-fit columns from the source DataFrame."""
+    ws.freeze_panes(1, 0)
+    ws.autofilter(0, 0, len(df), max(len(df.columns) - 1, 0))
+    _autofit_xlsx(ws, df)
 
 # ------------------------ 1) Personnel Excel export -------------------------
 
@@ -91,38 +101,38 @@ def export_personnel_excel(outfile: str | Path) -> Path:
         "Full Name": nco["name"].astype(str).str.strip()
     })
 
-    # Write workbook
+    # Write workbook (xlsxwriter, in memory; one write to disk at the end)
     outfile = Path(outfile)
-    with pd.ExcelWriter(outfile, engine="openpyxl") as xw:
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="xlsxwriter") as xw:
         # Sheet 1: Rollup
         df_out.to_excel(xw, sheet_name="Rollup", index=False)
-        ws = xw.book["Rollup"]
-        _freeze_and_fit(ws)
+        _freeze_and_fit_xlsx(xw.sheets["Rollup"], df_out)
 
-        # Sheet 2: Formatted
+        # Sheet 2: Formatted (title row, officers block, blank row, title row, NCO block)
         off_out.to_excel(xw, sheet_name="Formatted", index=False, startrow=1)
-        ws2 = xw.book["Formatted"]
-        ws2["A1"] = "Officers"
-        _autofit_worksheet(ws2)
-        start = ws2.max_row + 2
-        ws2[f"A{start}"] = "Warrant & NCOs"
+        ws2 = xw.sheets["Formatted"]
+        ws2.write_string(0, 0, "Officers")
+        start = len(off_out) + 4
+        ws2.write_string(start - 1, 0, "Warrant & NCOs")
         nco_out.to_excel(xw, sheet_name="Formatted", index=False, startrow=start)
-        _autofit_worksheet(ws2)
+        # Section titles live in column A next to the two blocks
+        titles = pd.DataFrame({"A": ["Officers", "Warrant & NCOs"]})
+        _autofit_xlsx(ws2, off_out, nco_out, titles)
+    outfile.write_bytes(buf.getvalue())
 
     return outfile
 
 # ---------------------- 2) Monthly overview Excel export --------------------
 
-LOGS_DIR = Path("logs")
-
 def _load_monthly_csv(name: str, year: int, month: int, cols: list[str]) -> pd.DataFrame:
     """
     Load a monthly CSV from ./logs with canonical columns.
     If the file does not exist, return an empty DataFrame with those columns.
     """
-    path = LOGS_DIR / f"{name}_{year:04d}_{month:02d}.csv"
+    path = LOGS_DIR / log_name(name, year, month)
     if path.exists():
-        df = pd.read_csv(path, dtype=str).fillna("")
+        df = _read_log_csv(path)
     else:
         df = pd.DataFrame(columns=cols)
     for c in cols:
@@ -130,6 +140,8 @@ def _load_monthly_csv(name: str, year: int, month: int, cols: list[str]) -> pd.D
             df[c] = ""
     return df
 
+RANGE_COLS = ["From", "To", "Registry No.", "Leave Type", "Comments", "Days"]
+
 def _compress_date_ranges(leaves_df: pd.DataFrame) -> pd.DataFrame:
     """
     Convert daily leave rows to contiguous date ranges per (registry_id, leave_type, comments).
@@ -137,7 +149,7 @@ def _compress_date_ranges(leaves_df: pd.DataFrame) -> pd.DataFrame:
     Output columns: From, To, Registry No., Leave Type, Comments, Days
     """
     if leaves_df.empty:
-        return pd.DataFrame(columns=["From","To","Registry No.","Leave Type","Comments","Days"])
+        return pd.DataFrame(columns=RANGE_COLS)
 
     df = leaves_df.copy().fillna("")
     # Ensure required columns
@@ -146,46 +158,30 @@ def _compress_date_ranges(leaves_df: pd.DataFrame) -> pd.DataFrame:
             df[c] = ""
 
     # Parse and sort by (person, type, comments, date)
-    df["__dt"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["__dt"]).sort_values(["registry_id", "leave_type", "comments", "__dt"])
-
-    rows = []
-    for (reg, ltype, comm), g in df.groupby(["registry_id", "leave_type", "comments"], dropna=False):
-        g = g.sort_values("__dt")
-        start = prev = None
-        count = 0
-        for d in g["__dt"]:
-            if start is None:
-                start = prev = d
-                count = 1
-                continue
-            # Extend contiguous range or flush current
-            if d == prev + timedelta(days=1):
-                prev = d
-                count += 1
-            else:
-                rows.append({
-                    "From": start.date().isoformat(),
-                    "To": prev.date().isoformat(),
-                    "Registry No.": reg,
-                    "Leave Type": ltype,
-                    "Comments": comm,
-                    "Days": count
-                })
-                start = prev = d
-                count = 1
-        # Flush the last open range
-        if start is not None:
-            rows.append({
-                "From": start.date().isoformat(),
-                "To": prev.date().isoformat(),
-                "Registry No.": reg,
-                "Leave Type": ltype,
-                "Comments": comm,
-                "Days": count
-            })
-
-    out = pd.DataFrame(rows, columns=["From","To","Registry No.","Leave Type","Comments","Days"])
+    keys = ["registry_id", "leave_type", "comments"]
+    # Dates are always written as YYYY-MM-DD; a fixed format skips inference
+    df["__dt"] = pd.to_datetime(df["date"], format="%Y-%m-%d", errors="coerce")
+    df = df.dropna(subset=["__dt"]).sort_values(keys + ["__dt"], kind="stable")
+    if df.empty:
+        return pd.DataFrame(columns=RANGE_COLS)
+
+    # Run detection on integer arrays: key code + day ordinal.
+    # A new range starts whenever the key changes or the day is not prev + 1.
+    codes = df.groupby(keys, sort=False).ngroup().to_numpy()
+    days = df["__dt"].to_numpy().astype("datetime64[D]").astype(np.int64)
+    is_new = np.ones(len(df), dtype=bool)
+    is_new[1:] = (codes[1:] != codes[:-1]) | (np.diff(days) != 1)
+    g = df.groupby(is_new.cumsum(), sort=False)
+
+    # Column-oriented build: one array per output column, no per-range dicts
+    out = pd.DataFrame({
+        "From": g["__dt"].first().dt.strftime("%Y-%m-%d"),
+        "To": g["__dt"].last().dt.strftime("%Y-%m-%d"),
+        "Registry No.": g["registry_id"].first(),
+        "Leave Type": g["leave_type"].first(),
+        "Comments": g["comments"].first(),
+        "Days": g.size(),
+    }).reset_index(drop=True)
     return out
 
 def export_monthly_overview(year: int, month: int, outfile: str | Path) -> Path:
@@ -216,11 +212,13 @@ def export_monthly_overview(year: int, month: int, outfile: str | Path) -> Path:
     # If no data at all, create a minimal workbook with an empty overview
     outfile = Path(outfile)
     if not all_dates:
-        with pd.ExcelWriter(outfile, engine="openpyxl") as xw:
+        buf = io.BytesIO()
+        with pd.ExcelWriter(buf, engine="xlsxwriter") as xw:
             pd.DataFrame(columns=[
                 "Date","Ship Status","Holiday","Description",
                 "# Leaves","# Unavailabilities","# Preferences"
             ]).to_excel(xw, sheet_name="Daily Overview", index=False)
+        outfile.write_bytes(buf.getvalue())
         return outfile
 
     # Sort dates ascending
@@ -229,28 +227,17 @@ def export_monthly_overview(year: int, month: int, outfile: str | Path) -> Path:
     except Exception:
         sorted_dates = sorted(all_dates)
 
-    # Pre-compute counts
-    cnt_leave  = leaves.groupby("date").size().to_dict() if not leaves.empty else {}
-    cnt_cannot = cannot.groupby("date").size().to_dict() if not cannot.empty else {}
-    cnt_prefer = prefer.groupby("date").size().to_dict() if not prefer.empty else {}
-
-    # Maps for ship status & holidays
-    ship_map = ship.set_index("date")["status"].to_dict() if not ship.empty else {}
-    hol_map  = hol.set_index("date")["description"].to_dict() if not hol.empty else {}
-
-    # Build overview rows
-    rows = []
-    for d in sorted_dates:
-        rows.append({
-            "Date": d,
-            "Ship Status": ship_map.get(d, ""),
-            "Holiday": "Yes" if d in hol_map else "No",
-            "Description": hol_map.get(d, ""),
-            "# Leaves": cnt_leave.get(d, 0),
-            "# Unavailabilities": cnt_cannot.get(d, 0),
-            "# Preferences": cnt_prefer.get(d, 0),
-        })
-    overview = pd.DataFrame(rows)
+    # Lookups keyed by date (last entry wins for duplicated dates)
+    ship_map = ship.drop_duplicates("date", keep="last").set_index("date")["status"]
+    hol_map  = hol.drop_duplicates("date", keep="last").set_index("date")["description"]
+
+    # Build overview columns with vectorized lookups over the date index
+    overview = pd.DataFrame({"Date": sorted_dates})
+    overview["Ship Status"] = overview["Date"].map(ship_map).fillna("")
+    overview["Holiday"] = overview["Date"].isin(hol_map.index).map({True: "Yes", False: "No"})
+    overview["Description"] = overview["Date"].map(hol_map).fillna("")
+    for label, df in (("# Leaves", leaves), ("# Unavailabilities", cannot), ("# Preferences", prefer)):
+        overview[label] = overview["Date"].map(df.groupby("date").size()).fillna(0).astype(int)
 
     # Human-friendly column names for detail sheets
     leaves_out = leaves.rename(columns={
@@ -273,30 +260,25 @@ def export_monthly_overview(year: int, month: int, outfile: str | Path) -> Path:
     # NEW: compressed "from-to" view for leaves
     leaves_ranges = _compress_date_ranges(leaves)
 
-    # Write workbook
-    with pd.ExcelWriter(outfile, engine="openpyxl") as xw:
-        overview.to_excel(xw, sheet_name="Daily Overview", index=False)
-        _freeze_and_fit(xw.book["Daily Overview"])
-
-        # NEW: Leaves as ranges (From-To)
-        leaves_ranges.to_excel(xw, sheet_name="Leaves (From-To)", index=False)
-        _freeze_and_fit(xw.book["Leaves (From-To)"])
-
+    sheets = [
+        ("Daily Overview", overview),
+        ("Leaves (From-To)", leaves_ranges),   # NEW: Leaves as ranges (From-To)
         # Existing daily-detail sheets
-        leaves_out.to_excel(xw, sheet_name="Leaves", index=False)
-        _freeze_and_fit(xw.book["Leaves"])
-
-        cannot_out.to_excel(xw, sheet_name="Unavailabilities", index=False)
-        _freeze_and_fit(xw.book["Unavailabilities"])
-
-        prefer_out.to_excel(xw, sheet_name="Preferences", index=False)
-        _freeze_and_fit(xw.book["Preferences"])
-
-        hol_out.to_excel(xw, sheet_name="Holidays", index=False)
-        _freeze_and_fit(xw.book["Holidays"])
-
-        ship_out.to_excel(xw, sheet_name="Ship Status", index=False)
-        _freeze_and_fit(xw.book["Ship Status"])
+        ("Leaves", leaves_out),
+        ("Unavailabilities", cannot_out),
+        ("Preferences", prefer_out),
+        ("Holidays", hol_out),
+        ("Ship Status", ship_out),
+    ]
+
+    # Write workbook (xlsxwriter: no cell-object graph is kept in memory)
+    # into a buffer, then flush the finished file to disk in one write
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="xlsxwriter") as xw:
+        for sheet_name, df in sheets:
+            df.to_excel(xw, sheet_name=sheet_name, index=False)
+            _freeze_and_fit_xlsx(xw.sheets[sheet_name], df)
+    outfile.write_bytes(buf.getvalue())
 
     return outfile
 
@@ -11,20 +11,33 @@
 # Run:  PYTHONPATH=. python app/gui_app.py
 # -----------------------------------------------------------------------------
 
+import bisect
+import csv
+import importlib.util
 import os
+import queue
+import re
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import numpy as np
 import pandas as pd
 from calendar import monthrange
+from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
 
-from app.export_service import export_personnel_excel
+from app.constants import OFFICER_RANKS
+from app.store import LOG_EXT
 from app.calendar_service import add_leave
 from app.calendar_service import (
     add_unavailable, add_preference, set_ship_status_bulk, add_holiday,
     set_month_all_in_port
 )
+from app.scheduling_prep import WATCH_TYPES as SCHEDULER_WATCH_TYPES
 
-from app.scheduler_in_port import make_month_schedule_all, export_month_schedule_all
+# app.export_service and app.scheduler_in_port (openpyxl, ...) are
+# imported where they are first used so the window comes up without them.
 
 # -----------------------------------------------------------------------------
 # Paths from project root
@@ -72,15 +85,70 @@ DUTIES = [
 ]
 
 WATCH_CHOICES = ["", "AF", "YF", "YFM", "BYFM", "BYF"]
-YEARS  = [str(y) for y in range(2000, 2061)]
-MONTHS = [f"{m:02d}" for m in range(1, 13)]
+YEARS   = tuple(str(y) for y in range(2000, 2061))
+MONTHS  = tuple(f"{m:02d}" for m in range(1, 13))
+DAYS_BY_LEN = {n: tuple(f"{d:02d}" for d in range(1, n + 1)) for n in (28, 29, 30, 31)}
+DAYS_31 = DAYS_BY_LEN[31]
+_MONTH_LEN = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+WEEKDAY_EN = ("MONDAY","TUESDAY","WEDNESDAY","THURSDAY","FRIDAY","SATURDAY","SUNDAY")
 MINIMAL_COLS_GR = ["Rank","Specialty","First Name","Last Name"]
+TREE_CHUNK = 200  # Treeview rows inserted per event-loop slice
+REFRESH_DEBOUNCE_MS = 80  # quiet time before a burst of selections refreshes the table
+# pyarrow's CSV parser when it is installed, pandas' C parser otherwise
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+
+# Columns of daily_leave_*.csv read by the leave tab (range and legacy daily layouts)
+LEAVE_READ_COLS = frozenset({
+    "start_date","end_date","date","registry_number","registry_id","leave_type","comments"
+})
+# Month encoded in a leave log name: daily_leave_YYYY_MM.csv
+LEAVE_FILE_RE = re.compile(r"daily_leave_(\d{4})_(\d{2})" + re.escape(LOG_EXT))
+# Zero-padded ISO date as built from the leave form's comboboxes
+DATE_RE = re.compile(r"([0-9]{4})-([0-9]{2})-([0-9]{2})")
 
 LEAVE_TYPES = [
     "Regular","AMD","Child Rearing Leave",
     "Verbal Leave","Parental Leave","Marriage Leave","Maternity Leave"
 ]
 
+def _iso_days(d1, d2) -> np.ndarray:
+    """ISO "YYYY-MM-DD" strings of every day from d1 to d2 inclusive, built with datetime64."""
+    return np.arange(np.datetime64(d1, "D"), np.datetime64(d2, "D") + 1, dtype="datetime64[D]").astype(str)
+
+def _month_len(y: str, m: str) -> int:
+    """Number of days in month m ("MM") of year y ("YYYY"); raises ValueError if invalid."""
+    yi, mi = int(y), int(m)
+    if not 1 <= mi <= 12:
+        raise ValueError(f"bad month: {m}")
+    if mi == 2 and yi % 4 == 0 and (yi % 100 != 0 or yi % 400 == 0):
+        return 29
+    return _MONTH_LEN[mi - 1]
+
+@lru_cache(maxsize=1024)
+def _split_duties(s: str) -> tuple:
+    """Parse a stored duty field ("a; b" or legacy "a|b"); cached per distinct string."""
+    s = s.strip()
+    return () if not s else tuple(p.strip() for p in s.replace("|",";").split(";") if p.strip())
+
+def _is_officer(rank: str) -> bool:
+    """Return True if rank is considered an officer."""
+    return str(rank).strip() in OFFICER_RANKS
+
+def _display_name(rank: str, specialty: str, name: str) -> str:
+    """Formats a name for display in the shifts preview table."""
+    rank = str(rank).strip()
+    specialty = str(specialty).strip()
+    name = str(name).strip()
+    if _is_officer(rank):
+        return f"{rank} | {name} HN"
+    spec = f" ({specialty})" if specialty else ""
+    return f"{rank}{spec} | {name}"
+
+@lru_cache(maxsize=4096)
+def _parse_ymd(s: str):
+    """date from 'YYYY-MM-DD' (ValueError if invalid); the same few dates recur on every action."""
+    return datetime.strptime(s, "%Y-%m-%d").date()
+
 # ------------------------------- IO helpers ----------------------------------
 def ensure_personnel_csv():
     """Ensure data folder and an empty personnel.csv exist."""
@@ -88,20 +156,79 @@ def ensure_personnel_csv():
     if not os.path.exists(PERSONNEL_CSV):
         pd.DataFrame(columns=CSV_COLS).to_csv(PERSONNEL_CSV, index=False, encoding="utf-8-sig")
 
-def load_personnel_df() -> pd.DataFrame:
-    """Load personnel from disk and guarantee all columns exist."""
-    ensure_personnel_csv()
-    df = pd.read_csv(PERSONNEL_CSV, dtype=str, encoding='utf-8-sig').fillna("")
+@lru_cache(maxsize=1)
+def _read_personnel_csv(mtime_ns: int, size: int) -> pd.DataFrame:
+    """Parse personnel.csv once per on-disk version (keyed by mtime/size)."""
+    df = pd.read_csv(PERSONNEL_CSV, dtype=str, encoding='utf-8-sig', engine=CSV_ENGINE).fillna("")
     for c in CSV_COLS:
         if c not in df.columns:
             df[c] = ""
     return df[CSV_COLS]
 
+def load_personnel_df() -> pd.DataFrame:
+    """Load personnel from disk and guarantee all columns exist."""
+    ensure_personnel_csv()
+    st = os.stat(PERSONNEL_CSV)
+    # callers mutate the result, so hand out a copy of the cached frame
+    return _read_personnel_csv(st.st_mtime_ns, st.st_size).copy()
+
 def save_personnel_df(df: pd.DataFrame):
     """Persist personnel to disk (UTF-8 with BOM for Excel)."""
     os.makedirs(DATA_DIR, exist_ok=True)
-    out = df.copy()[CSV_COLS].fillna("")
-    out.to_csv(PERSONNEL_CSV, index=False, encoding="utf-8-sig")
+    # columns= selects/orders without a copy; to_csv already writes NaN as ""
+    df.to_csv(PERSONNEL_CSV, columns=CSV_COLS, index=False, encoding="utf-8-sig")
+    _read_personnel_csv.cache_clear()
+
+def append_personnel_row(rec: dict) -> bool:
+    """
+    Append a single NEW record to personnel.csv without rewriting the file.
+    Returns False (nothing written) if the file layout does not allow a plain append.
+    """
+    ensure_personnel_csv()
+    with open(PERSONNEL_CSV, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            return False
+    with open(PERSONNEL_CSV, encoding="utf-8-sig", newline="") as f:
+        header = next(csv.reader(f), [])
+    if header != CSV_COLS:
+        return False
+    with open(PERSONNEL_CSV, "a", encoding="utf-8", newline="") as f:
+        csv.writer(f, lineterminator=os.linesep).writerow([rec.get(c, "") for c in CSV_COLS])
+    _read_personnel_csv.cache_clear()
+    return True
+
+def _read_leave_csv(path: str, cols: frozenset | None = None, **kwargs) -> pd.DataFrame:
+    """
+    read_csv for logs/daily_leave_*.csv: pyarrow engine when installed, C parser otherwise.
+    cols keeps only those columns (the ones present in the file).
+    """
+    if CSV_ENGINE == "pyarrow":
+        usecols = None
+        if cols is not None:
+            # pyarrow takes no callable usecols: pick the present columns from the header
+            with open(path, newline="", encoding=kwargs.get("encoding", "utf-8-sig")) as f:
+                usecols = [c for c in next(csv.reader(f), []) if c in cols]
+        if usecols is None or usecols:
+            try:
+                return pd.read_csv(path, engine="pyarrow", usecols=usecols, **kwargs)
+            except ValueError:
+                pass  # a file pyarrow cannot parse (e.g. ragged rows): retry with the C parser
+    if cols is not None:
+        kwargs["usecols"] = lambda c: c in cols
+    return pd.read_csv(path, **kwargs)
+
+def _write_leave_rows(path: str, header: list, rows: list) -> None:
+    """Rewrite a daily_leave_*.csv from string rows (temp file, then an atomic rename)."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(header)
+        w.writerows(rows)
+    os.replace(tmp, path)
 
 def import_minimal_excel_replace(path: str) -> pd.DataFrame:
     """
@@ -112,21 +239,80 @@ def import_minimal_excel_replace(path: str) -> pd.DataFrame:
     missing = [c for c in MINIMAL_COLS_GR if c not in df.columns]
     if missing:
         raise ValueError("Missing columns: " + ", ".join(missing))
-    out_rows = []
-    for i, r in df.iterrows():
-        rank = r["Rank"].strip()
-        spec = r["Specialty"].strip()
-        first = r["First Name"].strip()
-        last  = r["Last Name"].strip()
-        name  = f"{first} {last}".strip()
-        reg   = f"PN-IM-{i+1:04d}"
-        out_rows.append({
-            "registry_number": reg, "name": name, "rank": rank, "specialty": spec,
-            "duty": "", "primary_shift": "", "alt_shift": "", "at_sea_shift": "",
-            "height": "", "weight": "", "address": "", "phone": "",
-            "marital_status": "", "children": "", "pye_expiration": "", "notes": ""
-        })
-    return pd.DataFrame(out_rows, columns=CSV_COLS)
+    src = {c: df[c].str.strip() for c in MINIMAL_COLS_GR}
+    out = pd.DataFrame("", index=range(len(df)), columns=CSV_COLS)
+    out["registry_number"] = [f"PN-IM-{i:04d}" for i in range(1, len(df) + 1)]
+    out["name"] = (src["First Name"] + " " + src["Last Name"]).str.strip().to_numpy()
+    out["rank"] = src["Rank"].to_numpy()
+    out["specialty"] = src["Specialty"].to_numpy()
+    return out
+
+# ------------------------------ shared model ---------------------------------
+class PersonnelModel:
+    """
+    The personnel.csv contents, held once in memory and shared by all tabs.
+    Saves/deletes go through here (and to disk); subscribers get the new frame.
+    The file is re-read only when something else has changed it on disk.
+    """
+    def __init__(self):
+        self._subs = []
+        self._load()
+
+    def _stamp_now(self):
+        ensure_personnel_csv()
+        st = os.stat(PERSONNEL_CSV)
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self):
+        self.df = load_personnel_df()
+        self._stamp = self._stamp_now()
+
+    def current(self) -> pd.DataFrame:
+        """The personnel frame, re-read first if personnel.csv changed behind our back."""
+        if self._stamp_now() != self._stamp:
+            self._load()
+        return self.df
+
+    def subscribe(self, fn):
+        self._subs.append(fn)
+
+    def _notify(self):
+        for fn in self._subs:
+            try:
+                fn(self.df)
+            except Exception:
+                pass
+
+    def reload(self) -> pd.DataFrame:
+        self._load()
+        self._notify()
+        return self.df
+
+    def upsert(self, rec: dict) -> bool:
+        """Write one record (matched by registry_number); returns True if it was added."""
+        df = self.current()
+        values = [rec[c] for c in CSV_COLS]
+        idx_list = df.index[df["registry_number"]==rec["registry_number"]].tolist()
+        if idx_list:
+            df.loc[idx_list[0], CSV_COLS] = values
+            save_personnel_df(df)
+            added = False
+        else:
+            df.loc[len(df)] = values
+            # new records go to the end of the file; rewrite only if that is not possible
+            if not append_personnel_row(rec):
+                save_personnel_df(df)
+            added = True
+        self._stamp = self._stamp_now()
+        self._notify()
+        return added
+
+    def delete(self, rid: str):
+        df = self.current()
+        self.df = df[df["registry_number"]!=rid].reset_index(drop=True)
+        save_personnel_df(self.df)
+        self._stamp = self._stamp_now()
+        self._notify()
 
 # ============================ TAB 1: PERSONNEL ===============================
 class PersonnelManager(ttk.Frame):
@@ -136,14 +322,19 @@ class PersonnelManager(ttk.Frame):
     - You can import a "simple" Excel (ONLY in memory — DOES NOT write to CSV).
     - Edit/New entry and Save -> updates ONLY the specific record in the CSV.
     - Delete -> updates the CSV.
-    - On each save/delete, it notifies the other tabs via callback.
+    - Saves/deletes go through the shared PersonnelModel, which notifies the other tabs.
     """
-    def __init__(self, master, on_personnel_changed=None):
+    def __init__(self, master, model: PersonnelModel):
         super().__init__(master, padding=12)
-        self.on_personnel_changed = on_personnel_changed
+        self.model = model
 
         # in-memory dataframe (starts empty)
         self.df = pd.DataFrame(columns=CSV_COLS)
+        self._last_rows = {}  # registry_number -> values currently shown in the tree
+        self._rid_index = {}  # registry_number -> position in self.df
+        self._fill_job = None  # pending after() id while a large table is being filled
+        self._sort_rids = []   # registry numbers (df order) behind the memoized _sort_order
+        self._sort_order = []
 
         ensure_personnel_csv()
         self._build_ui()
@@ -163,17 +354,19 @@ class PersonnelManager(ttk.Frame):
         toolbar = ttk.Frame(top)
         toolbar.pack(fill="x", pady=(0,8))
 
-        ttk.Button(
+        self.btn_import = ttk.Button(
             toolbar,
             text="Load from Excel",
             command=self._on_import_minimal_replace
-        ).pack(side="left")
+        )
+        self.btn_import.pack(side="left")
 
-        ttk.Button(
+        self.btn_export = ttk.Button(
             toolbar,
             text="Export Personnel (Excel)",
             command=self._on_export_excel
-        ).pack(side="left", padx=12)
+        )
+        self.btn_export.pack(side="left", padx=12)
 
         # Split (left table / right form)
         main = ttk.Frame(top); main.pack(fill="both", expand=True)
@@ -269,7 +462,7 @@ class PersonnelManager(ttk.Frame):
         self.var_pye_day   = tk.StringVar(value="")
         self.cb_pye_year  = ttk.Combobox(frm_pye,textvariable=self.var_pye_year, values=YEARS,  width=6, state="readonly")
         self.cb_pye_month = ttk.Combobox(frm_pye,textvariable=self.var_pye_month,values=MONTHS,width=4, state="readonly")
-        self.cb_pye_day   = ttk.Combobox(frm_pye,textvariable=self.var_pye_day,  values=[f"{d:02d}" for d in range(1,32)], width=4, state="readonly")
+        self.cb_pye_day   = ttk.Combobox(frm_pye,textvariable=self.var_pye_day,  values=DAYS_31, width=4, state="readonly")
         self.cb_pye_year.pack(side="left"); ttk.Label(frm_pye,text="-").pack(side="left",padx=3)
         self.cb_pye_month.pack(side="left"); ttk.Label(frm_pye,text="-").pack(side="left",padx=3)
         self.cb_pye_day.pack(side="left")
@@ -279,8 +472,8 @@ class PersonnelManager(ttk.Frame):
             y = self.var_pye_year.get(); m = self.var_pye_month.get()
             if y and m:
                 try:
-                    last = monthrange(int(y), int(m))[1]
-                    self.cb_pye_day["values"] = [f"{dd:02d}" for dd in range(1,last+1)]
+                    last = _month_len(y, m)
+                    self.cb_pye_day["values"] = DAYS_BY_LEN[last]
                     if self.var_pye_day.get() and int(self.var_pye_day.get())>last:
                         self.var_pye_day.set(f"{last:02d}")
                 except Exception:
@@ -304,19 +497,66 @@ class PersonnelManager(ttk.Frame):
         self.txt_log.insert("end", msg + "\n"); self.txt_log.see("end")
 
     def _refresh_table(self):
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
-        if not self.df.empty:
-            view = self.df.sort_values("registry_number")
-            for idx, (_, r) in enumerate(view.iterrows(), start=1):
-                self.tree.insert(
-                    "", "end", iid=r["registry_number"],
-                    values=(idx, r["rank"], r["specialty"], r["name"], r["registry_number"])
-                )
+        # every assignment of self.df is followed by a refresh, so the index lives here
+        rids = self.df["registry_number"].tolist()
+        self._rid_index = {}
+        for pos, rid in enumerate(rids):
+            self._rid_index.setdefault(rid, pos)
+
+        # Diff against the rows already shown: only added/changed rows are sent to Tk.
+        new_rows = {}
+        ranks = self.df["rank"].tolist()
+        specs = self.df["specialty"].tolist()
+        names = self.df["name"].tolist()
+        for idx, p in enumerate(self._sorted_order(rids), start=1):
+            new_rows[rids[p]] = (idx, ranks[p], specs[p], names[p], rids[p])
+
+        if self._fill_job is not None:
+            self.after_cancel(self._fill_job)
+            self._fill_job = None
+        removed = [iid for iid in self._last_rows if iid not in new_rows]
+        if removed:
+            self.tree.delete(*removed)
+            for iid in removed:
+                del self._last_rows[iid]
+        self._apply_rows(list(new_rows.items()))
+
+    def _sorted_order(self, rids):
+        """Row positions of self.df in registry-number order, memoized across refreshes."""
+        cached = self._sort_rids
+        if rids == cached:
+            # same people in the same order (e.g. an edited record): the order still holds
+            return self._sort_order
+        if len(rids) == len(cached) + 1 and rids[:-1] == cached:
+            # one record appended (a new save): slot it in instead of re-sorting
+            keys = [cached[p] for p in self._sort_order]
+            at = bisect.bisect_right(keys, rids[-1])
+            order = self._sort_order[:at] + [len(cached)] + self._sort_order[at:]
+        else:
+            order = sorted(range(len(rids)), key=rids.__getitem__)
+        self._sort_rids, self._sort_order = rids, order
+        return order
+
+    def _apply_rows(self, items, start=0):
+        """Send table rows to Tk in TREE_CHUNK slices; later slices run from the event loop."""
+        self._fill_job = None
+        stop = min(start + TREE_CHUNK, len(items))
+        # raw Tcl commands: skips the ttk option formatting done on every insert/item call
+        tcall, w = self.tree.tk.call, self.tree._w
+        # the tree stays sorted by registry number, so pos is the final slot of each new row
+        for pos in range(start, stop):
+            rid, values = items[pos]
+            prev = self._last_rows.get(rid)
+            if prev is None:
+                tcall(w, "insert", "", pos, "-id", rid, "-values", values)
+            elif prev != values:
+                tcall(w, "item", rid, "-values", values)
+            self._last_rows[rid] = values
+        if stop < len(items):
+            self._fill_job = self.after(1, self._apply_rows, items, stop)
 
     def _duties_from_field(self, s: str):
-        s = (s or "").strip()
-        return [] if not s else [p.strip() for p in s.replace("|",";").split(";") if p.strip()]
+        return _split_duties(s or "")
 
     def _duties_to_field(self) -> str:
         return "; ".join(self.list_duties.get(0,"end"))
@@ -328,18 +568,44 @@ class PersonnelManager(ttk.Frame):
     def _load_pye_into_dropdowns(self, iso: str):
         iso = (iso or "").strip()
         if len(iso)==10 and iso[4]=="-" and iso[7]=="-":
-            y,m,d = iso.split("-")
+            # fixed-width YYYY-MM-DD: slice instead of split
+            y, m, d = iso[:4], iso[5:7], iso[8:10]
             if y in YEARS: self.var_pye_year.set(y)
             if m in MONTHS: self.var_pye_month.set(m)
-            try:
-                last = monthrange(int(y), int(m))[1]
-                self.cb_pye_day["values"] = [f"{dd:02d}" for dd in range(1,last+1)]
-            except Exception:
-                pass
-            if len(d)==2: self.var_pye_day.set(d)
+            if y.isdigit() and m in MONTHS:
+                self.cb_pye_day["values"] = DAYS_BY_LEN[_month_len(y, m)]
+            self.var_pye_day.set(d)
         else:
             self.var_pye_year.set(""); self.var_pye_month.set(""); self.var_pye_day.set("")
 
+    def _run_in_background(self, work, on_done, button=None):
+        """
+        Run work() on a worker thread (Excel IO) so the window stays responsive.
+        on_done(result, error) is called back on the Tk thread; button is disabled meanwhile.
+        """
+        results = queue.Queue(maxsize=1)
+
+        def worker():
+            try:
+                results.put((work(), None))
+            except Exception as e:
+                results.put((None, e))
+
+        def poll():
+            try:
+                res, err = results.get_nowait()
+            except queue.Empty:
+                self.after(50, poll)
+                return
+            if button is not None:
+                button.state(["!disabled"])
+            on_done(res, err)
+
+        if button is not None:
+            button.state(["disabled"])
+        threading.Thread(target=worker, daemon=True).start()
+        self.after(50, poll)
+
     # ---------------------------- actions ------------------------------------
     def _on_import_minimal_replace(self):
         """
@@ -352,14 +618,20 @@ class PersonnelManager(ttk.Frame):
         )
         if not path:
             return
-        try:
-            new_df = import_minimal_excel_replace(path)
-        except Exception as e:
-            messagebox.showerror("Import Error", f"{e}")
+        self._log(f"Loading {os.path.basename(path)} ...")
+        self._run_in_background(
+            lambda: import_minimal_excel_replace(path),
+            lambda new_df, err: self._apply_imported_df(path, new_df, err),
+            button=self.btn_import
+        )
+
+    def _apply_imported_df(self, path, new_df, err):
+        if err is not None:
+            messagebox.showerror("Import Error", f"{err}")
             return
 
         # load into memory, DO NOT write to CSV
-        self.df = new_df.copy()
+        self.df = new_df
         self._refresh_table()
         self._log(f"✅ Loaded (IN MEMORY ONLY) from: {os.path.basename(path)}")
         messagebox.showinfo(
@@ -394,16 +666,17 @@ class PersonnelManager(ttk.Frame):
         if not sel:
             return
         rid = sel[0]
-        row = self.df[self.df["registry_number"]==rid]
-        if row.empty:
+        pos = self._rid_index.get(rid)
+        if pos is None:
             return
-        rec = row.iloc[0].to_dict()
+        rec = self.df.iloc[pos].to_dict()
         for k in CSV_COLS:
             if k in self.inputs and k not in ("duty","pye_expiration"):
                 self.inputs[k].set(str(rec.get(k,"")))
         self.list_duties.delete(0,"end")
-        for d in self._duties_from_field(rec.get("duty","")):
-            self.list_duties.insert("end", d)
+        duties = self._duties_from_field(rec.get("duty",""))
+        if duties:
+            self.list_duties.insert("end", *duties)
         self._load_pye_into_dropdowns(rec.get("pye_expiration",""))
         self._log(f"Loading: {rid}")
 
@@ -414,13 +687,6 @@ class PersonnelManager(ttk.Frame):
         self.var_pye_year.set(""); self.var_pye_month.set(""); self.var_pye_day.set("")
         self._log("New record: fill in the fields and press «Save».")
 
-    def _notify_change(self):
-        if callable(self.on_personnel_changed):
-            try:
-                self.on_personnel_changed()
-            except Exception:
-                pass
-
     def _on_save(self):
         # collect values from form
         rec = {k: (self.inputs[k].get().strip() if k in self.inputs else "") for k in CSV_COLS}
@@ -451,21 +717,14 @@ class PersonnelManager(ttk.Frame):
                 return
 
         # write ONLY this record to personnel.csv
-        disk_df = load_personnel_df()
-        idx_list = disk_df.index[disk_df["registry_number"]==rid].tolist()
-        if idx_list:
-            disk_df.loc[idx_list[0], CSV_COLS] = [rec[c] for c in CSV_COLS]
-            self._log(f"Updated (on disk): {rid}")
-        else:
-            disk_df.loc[len(disk_df)] = [rec[c] for c in CSV_COLS]
+        if self.model.upsert(rec):
             self._log(f"Added (on disk): {rid}")
-
-        save_personnel_df(disk_df)
+        else:
+            self._log(f"Updated (on disk): {rid}")
 
         # refresh in-memory table
-        self.df = disk_df.copy()
+        self.df = self.model.df
         self._refresh_table()
-        self._notify_change()
         messagebox.showinfo("Done","Saved to personnel.csv")
 
     def _on_delete(self):
@@ -475,25 +734,31 @@ class PersonnelManager(ttk.Frame):
             return
         rid = sel[0]
         if messagebox.askyesno("Confirmation", f"Delete {rid}?"):
-            disk_df = load_personnel_df()
-            disk_df = disk_df[disk_df["registry_number"]!=rid].reset_index(drop=True)
-            save_personnel_df(disk_df)
-            self.df = disk_df.copy()
+            self.model.delete(rid)
+            self.df = self.model.df
             self._refresh_table()
-            self._notify_change()
             self._log(f"Deleted: {rid}")
 
     def _on_reload(self):
         # load from CSV -> replaces the in-memory view (e.g., after manual changes)
-        self.df = load_personnel_df()
+        self.df = self.model.reload()
         self._refresh_table()
         self._log("Loading from CSV.")
-        self._notify_change()
 
     def _on_export_excel(self):
+        from app.export_service import export_personnel_excel
         out_path = os.path.join(DATA_DIR,"Personnel.xlsx")
         os.makedirs(DATA_DIR, exist_ok=True)
-        out = export_personnel_excel(out_path)
+        self._run_in_background(
+            lambda: export_personnel_excel(out_path),
+            self._on_export_done,
+            button=self.btn_export
+        )
+
+    def _on_export_done(self, out, err):
+        if err is not None:
+            messagebox.showerror("Export Error", f"{err}")
+            return
         self._log(f"✅ Personnel export: {out}")
         messagebox.showinfo("Success", f"Personnel exported to:\n{out}")
 
@@ -502,32 +767,38 @@ class LeaveManager(ttk.Frame):
     """Tab 2: Leave Management with view, filters, sorting,
     delete/edit, and export (one sheet per month)."""
 
-    def __init__(self, master):
+    def __init__(self, master, model: PersonnelModel):
         super().__init__(master, padding=12)
         os.makedirs(LOGS_DIR, exist_ok=True)
-        self.people = []
+        self.model = model
+        self._labels = []        # combobox labels
+        self._label_to_rid = {}  # combobox label -> registry number
         self.sort_asc = True
         self.filter_year = ""   # "" = all
         self.filter_month = ""  # "" = all
         self._edit_buffer = None
+        self._fill_job = None
+        self._refresh_after_id = None
+        self._leaves_cache = {}  # path -> (mtime_ns, size, leave rows parsed from it, those rows by registry)
+        self._log_buf = []       # messages waiting for the next idle flush
+        self._log_pending = False
         self._build_ui()
         self.reload_people()
 
     # ---------- public API (called by Tab1 when personnel changes)
-    def reload_people(self):
-        df = load_personnel_df()
-        people = []
-        for _, r in df.iterrows():
-            rid = str(r["registry_number"]).strip()
-            nm  = str(r["name"]).strip()
-            rk  = str(r["rank"]).strip()
-            sp  = str(r["specialty"]).strip()
-            people.append({"rid": rid, "label": f"{rid} | {rk} ({sp}) | {nm}"})
-        self.people = people
-        self.cb_person["values"] = [p["label"] for p in people]
-        if people and not self.var_person.get():
+    def reload_people(self, df=None):
+        if df is None:
+            df = self.model.current()
+        rid = df["registry_number"].str.strip()
+        nm  = df["name"].str.strip()
+        rk  = df["rank"].str.strip()
+        sp  = df["specialty"].str.strip()
+        self._labels = (rid + " | " + rk + " (" + sp + ") | " + nm).tolist()
+        self._label_to_rid = dict(zip(self._labels, rid.tolist()))
+        self.cb_person["values"] = self._labels
+        if self._labels and not self.var_person.get():
             self.cb_person.current(0)
-        self._log(f"Personnel available: {len(people)}")
+        self._log(f"Personnel available: {len(self._labels)}")
         self._refresh_table_for_current_person()
 
     # ---------- UI ----------
@@ -538,7 +809,7 @@ class LeaveManager(ttk.Frame):
         self.var_person = tk.StringVar()
         self.cb_person = ttk.Combobox(hdr, textvariable=self.var_person, values=[], width=60, state="readonly")
         self.cb_person.pack(side="left", padx=(4,10))
-        self.cb_person.bind("<<ComboboxSelected>>", lambda e: self._refresh_table_for_current_person())
+        self.cb_person.bind("<<ComboboxSelected>>", self._schedule_refresh)
         ttk.Button(hdr, text="Refresh Personnel", command=self.reload_people).pack(side="left", padx=(0,10))
         ttk.Button(hdr, text="Export Excel (Leaves)", command=self._on_export_leaves_excel).pack(side="left")
 
@@ -547,8 +818,8 @@ class LeaveManager(ttk.Frame):
         ttk.Label(filters, text="Filter: Month").pack(side="left")
         self.var_f_m = tk.StringVar(value="All")
         self.var_f_y = tk.StringVar(value="All")
-        months_ui = ["All"] + [f"{m:02d}" for m in range(1,13)]
-        years_ui  = ["All"] + YEARS
+        months_ui = ("All",) + MONTHS
+        years_ui  = ("All",) + YEARS
         ttk.Combobox(filters, textvariable=self.var_f_m, values=months_ui, width=6, state="readonly").pack(side="left", padx=(4,12))
         ttk.Label(filters, text="Year").pack(side="left")
         ttk.Combobox(filters, textvariable=self.var_f_y, values=years_ui, width=8, state="readonly").pack(side="left", padx=(4,12))
@@ -570,21 +841,18 @@ class LeaveManager(ttk.Frame):
         ttk.Combobox(row1, textvariable=self.var_leave_type, values=self.LEAVE_TYPES,
                          width=28, state="readonly").pack(side="left", padx=(4,18))
 
-        DAYS_31   = [f"{d:02d}" for d in range(1, 32)]
-        MONTHS_12 = [f"{m:02d}" for m in range(1, 13)]
-
         def date_picker(parent, label, vday, vmon, vyear):
             fr = ttk.Frame(parent); fr.pack(side="left", padx=(0,20))
             ttk.Label(fr, text=label).pack(side="left")
             cb_d = ttk.Combobox(fr, textvariable=vday,  values=DAYS_31,  width=4, state="readonly");  cb_d.pack(side="left", padx=(4,2))
-            cb_m = ttk.Combobox(fr, textvariable=vmon,  values=MONTHS_12, width=4, state="readonly"); cb_m.pack(side="left", padx=(2,2))
+            cb_m = ttk.Combobox(fr, textvariable=vmon,  values=MONTHS,    width=4, state="readonly"); cb_m.pack(side="left", padx=(2,2))
             cb_y = ttk.Combobox(fr, textvariable=vyear, values=YEARS,     width=6, state="readonly"); cb_y.pack(side="left", padx=(2,0))
             def _sync_days(*_):
                 y, m = vyear.get(), vmon.get()
                 if y and m:
                     try:
-                        last = monthrange(int(y), int(m))[1]
-                        cb_d["values"] = [f"{dd:02d}" for dd in range(1, last+1)]
+                        last = _month_len(y, m)
+                        cb_d["values"] = DAYS_BY_LEN[last]
                         if vday.get():
                             try:
                                 if int(vday.get()) > last:
@@ -631,12 +899,10 @@ class LeaveManager(ttk.Frame):
         self.menu = tk.Menu(self, tearoff=0)
         self.menu.add_command(label="Load for editing", command=self._on_load_for_edit)
         self.menu.add_command(label="Delete", command=self._on_delete_selected)
-        # Bind variants for macOS and others
-        self.tree.bind("<Button-3>", self._open_ctx_menu)         # right-click (Win/Linux)
-        self.tree.bind("<ButtonRelease-3>", self._open_ctx_menu)
-        self.tree.bind("<Button-2>", self._open_ctx_menu)         # two-finger/right on mac
-        self.tree.bind("<ButtonRelease-2>", self._open_ctx_menu)
-        self.tree.bind("<Control-Button-1>", self._open_ctx_menu) # Ctrl+Click (mac)
+        # One virtual event covers right-click (Win/Linux), two-finger/right (mac)
+        # and Ctrl+Click (mac), so each click opens the menu exactly once
+        self.tree.event_add("<<RightClick>>", "<Button-3>", "<Button-2>", "<Control-Button-1>")
+        self.tree.bind("<<RightClick>>", self._open_ctx_menu)
 
         # Log
         grp_log = ttk.LabelFrame(self, text="Logs")
@@ -646,19 +912,26 @@ class LeaveManager(ttk.Frame):
 
     # ---------- Data helpers ----------
     def _log(self, msg: str):
-        self.txt_log.insert("end", msg + "\n"); self.txt_log.see("end")
+        # buffered: a burst of messages becomes one Text insert on the next idle
+        self._log_buf.append(msg)
+        if not self._log_pending:
+            self._log_pending = True
+            self.after_idle(self._flush_log)
+
+    def _flush_log(self):
+        self._log_pending = False
+        if self._log_buf:
+            self.txt_log.insert("end", "\n".join(self._log_buf) + "\n"); self.txt_log.see("end")
+            self._log_buf.clear()
 
     def _selected_registry(self) -> str:
-        label = self.var_person.get().strip()
-        for p in self.people:
-            if p["label"] == label:
-                return p["rid"]
-        return ""
+        return self._label_to_rid.get(self.var_person.get().strip(), "")
 
     def _open_ctx_menu(self, event):
         """Open context menu selecting the row under cursor (macOS-safe)."""
         iid = self.tree.identify_row(event.y)
-        if iid:
+        # the menu actions work on the selection, so only move it when it differs
+        if iid and self.tree.selection() != (iid,):
             self.tree.selection_set(iid)
             self.tree.focus(iid)
         try:
@@ -671,87 +944,126 @@ class LeaveManager(ttk.Frame):
         return "break"
 
     # ---------- IO: read leaves (supports daily + ranged formats) ----------
-    def _read_all_leaves_rows(self):
-        rows = []
+    def _leave_file_entries(self):
+        """Cache entries of every readable leave file in logs/; unchanged files are not re-parsed."""
+        entries = []
         if not os.path.exists(LOGS_DIR):
-            return rows
-        for filename in os.listdir(LOGS_DIR):
-            if not (filename.startswith("daily_leave_") and filename.endswith(".csv")):
-                continue
-            full = os.path.join(LOGS_DIR, filename)
-            try:
-                df = pd.read_csv(full, dtype=str, encoding='utf-8-sig').fillna("")
-            except Exception:
-                continue
-            if "start_date" in df.columns:
-                # New format: start/end range
-                if "registry_number" not in df.columns and "registry_id" in df.columns:
-                    df["registry_number"] = df["registry_id"]
-                for _, r in df.iterrows():
-                    rows.append({
-                        "start_date": r.get("start_date",""),
-                        "end_date":   r.get("end_date","") or r.get("start_date",""),
-                        "registry_number": r.get("registry_number",""),
-                        "leave_type": r.get("leave_type",""),
-                        "comments":   r.get("comments","")
-                    })
-            elif "date" in df.columns:
-                # Old daily format: collapse to ranges
-                if "registry_number" not in df.columns and "registry_id" in df.columns:
-                    df["registry_number"] = df["registry_id"]
-                daily = []
-                for _, r in df.iterrows():
-                    daily.append({
-                        "date": r.get("date",""),
-                        "registry_number": r.get("registry_number",""),
-                        "leave_type": r.get("leave_type",""),
-                        "comments": r.get("comments","")
-                    })
-                rows.extend(self._collapse_daily_to_ranges(daily))
+            return entries
+        seen = set()
+        with os.scandir(LOGS_DIR) as it:
+            for entry in it:
+                filename = entry.name
+                if not (filename.startswith("daily_leave_") and filename.endswith(LOG_EXT)):
+                    continue
+                full = entry.path
+                seen.add(full)
+                st = entry.stat()
+                hit = self._leaves_cache.get(full)
+                if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+                    entries.append(hit)
+                    continue
+                file_rows = self._parse_leave_file(full)
+                if file_rows is None:
+                    continue
+                by_rid = {}
+                for r in file_rows:
+                    by_rid.setdefault(r["registry_number"], []).append(r)
+                hit = self._leaves_cache[full] = (st.st_mtime_ns, st.st_size, file_rows, by_rid)
+                entries.append(hit)
+        for stale in self._leaves_cache.keys() - seen:
+            del self._leaves_cache[stale]
+        return entries
+
+    def _read_all_leaves_rows(self, rid=None):
+        """All leave ranges in logs/, or only those of registry number rid (per-file index lookup)."""
+        rows = []
+        if rid is None:
+            for entry in self._leave_file_entries():
+                rows.extend(entry[2])
+        else:
+            for entry in self._leave_file_entries():
+                rows.extend(entry[3].get(rid, ()))
+        return rows
+
+    def _parse_leave_file(self, full):
+        """Leave ranges of one daily_leave_*.csv (None if unreadable)."""
+        rows = []
+        try:
+            # only the columns used below; na_filter=False keeps empty cells as "" (no NaN pass)
+            df = _read_leave_csv(full, LEAVE_READ_COLS, dtype=str,
+                                 encoding='utf-8-sig', na_filter=False)
+        except Exception:
+            return None
+        if "registry_number" not in df.columns and "registry_id" in df.columns:
+            df["registry_number"] = df["registry_id"]
+        for c in ("registry_number", "leave_type", "comments", "end_date"):
+            if c not in df.columns:
+                df[c] = ""
+        # columns are zipped as plain lists: no per-row Series
+        if "start_date" in df.columns:
+            # New format: start/end range
+            rows = [
+                {"start_date": sd, "end_date": ed or sd, "registry_number": rn,
+                 "leave_type": lt, "comments": cm}
+                for sd, ed, rn, lt, cm in zip(
+                    df["start_date"].tolist(), df["end_date"].tolist(), df["registry_number"].tolist(),
+                    df["leave_type"].tolist(), df["comments"].tolist()
+                )
+            ]
+        elif "date" in df.columns:
+            # Old daily format: collapse to ranges
+            daily = [
+                {"date": dt, "registry_number": rn, "leave_type": lt, "comments": cm}
+                for dt, rn, lt, cm in zip(
+                    df["date"].tolist(), df["registry_number"].tolist(),
+                    df["leave_type"].tolist(), df["comments"].tolist()
+                )
+            ]
+            rows = self._collapse_daily_to_ranges(daily)
         return rows
 
     def _collapse_daily_to_ranges(self, daily_rows):
         """Group consecutive daily leaves per person/type/comment into ranges."""
-        from datetime import datetime, timedelta
-        out = []
-        keyfunc = lambda r: (r["registry_number"], r["leave_type"], r.get("comments",""))
-        daily_rows = [r for r in daily_rows if r.get("date")]
-        daily_rows.sort(key=lambda r: (r["registry_number"], r["leave_type"], r.get("comments",""), r["date"]))
-        i = 0
-        while i < len(daily_rows):
-            r = daily_rows[i]
-            rid, ltype, comm = keyfunc(r)
-            start = end = r["date"]
-            j = i + 1
-            while j < len(daily_rows):
-                r2 = daily_rows[j]
-                if keyfunc(r2) != (rid, ltype, comm):
-                    break
-                try:
-                    d1 = datetime.strptime(end, "%Y-%m-%d").date()
-                    d2 = datetime.strptime(r2["date"], "%Y-%m-%d").date()
-                    if (d1 + timedelta(days=1)) == d2:
-                        end = r2["date"]; j += 1; continue
-                except Exception:
-                    pass
-                break
-            out.append({
-                "start_date": start, "end_date": end,
-                "registry_number": rid, "leave_type": ltype, "comments": comm
-            })
-            i = j
-        return out
+        keys = ["registry_number", "leave_type", "comments"]
+        df = pd.DataFrame(daily_rows, columns=keys + ["date"]).fillna("")
+        df = df[df["date"] != ""]
+        if df.empty:
+            return []
+        df = df.sort_values(keys + ["date"], kind="stable")
+        cols = {c: df[c].to_numpy(dtype=object) for c in keys + ["date"]}
+
+        # one batch parse; unparseable dates become NaT and never join a run
+        day = pd.to_datetime(df["date"], format="%Y-%m-%d", errors="coerce").to_numpy(dtype="datetime64[D]")
+        cont = np.diff(day) == np.timedelta64(1, "D")
+        for c in keys:
+            cont &= cols[c][1:] == cols[c][:-1]
+        starts = np.flatnonzero(np.r_[True, ~cont])
+        ends = np.r_[starts[1:] - 1, len(df) - 1]
+
+        dates, rid, ltype, comm = cols["date"], cols["registry_number"], cols["leave_type"], cols["comments"]
+        return [
+            {"start_date": dates[a], "end_date": dates[b],
+             "registry_number": rid[a], "leave_type": ltype[a], "comments": comm[a]}
+            for a, b in zip(starts.tolist(), ends.tolist())
+        ]
 
     def _refresh_table_for_current_person(self):
         """Apply filters/sort and display one row per (start–end) range."""
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
+        if self._refresh_after_id is not None:
+            self.after_cancel(self._refresh_after_id)
+            self._refresh_after_id = None
+        if self._fill_job is not None:
+            self.after_cancel(self._fill_job)
+            self._fill_job = None
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
 
         rid = self._selected_registry()
         if not rid:
             return
 
-        rows = [r for r in self._read_all_leaves_rows() if r["registry_number"] == rid]
+        rows = self._read_all_leaves_rows(rid)
 
         # filters
         m = self.filter_month
@@ -767,45 +1079,62 @@ class LeaveManager(ttk.Frame):
             rows = [r for r in rows if keep(r)]
 
         # sorting
-        rows.sort(key=lambda r: r.get("start_date",""), reverse=not self.sort_asc)
+        rows.sort(key=itemgetter("start_date"), reverse=not self.sort_asc)
 
-        # show
-        for r in rows:
-            self.tree.insert("", "end", values=(r.get("start_date",""), r.get("end_date",""),
-                                                 r.get("leave_type",""), r.get("comments","")))
+        # show (value tuples built once, ahead of the chunked inserts)
+        values = [(r["start_date"], r["end_date"], r["leave_type"], r["comments"]) for r in rows]
+        self._fill_tree(values)
         self._log(f"Displaying leaves for {rid}: {len(rows)} records.")
 
+    def _schedule_refresh(self, _=None):
+        """Coalesce bursts of selection/filter events into one table refresh."""
+        if self._refresh_after_id is not None:
+            self.after_cancel(self._refresh_after_id)
+        self._refresh_after_id = self.after(REFRESH_DEBOUNCE_MS, self._refresh_table_for_current_person)
+
+    def _fill_tree(self, values, start=0):
+        """Insert prebuilt value tuples in TREE_CHUNK slices; later slices run from the event loop."""
+        self._fill_job = None
+        stop = start + TREE_CHUNK
+        tcall, w = self.tree.tk.call, self.tree._w
+        for vals in values[start:stop]:
+            tcall(w, "insert", "", "end", "-values", vals)
+        if stop < len(values):
+            self._fill_job = self.after(1, self._fill_tree, values, stop)
+
     # ---------- validations ----------
     def _dates_ok(self, start, end) -> bool:
-        from datetime import datetime
         try:
-            s = datetime.strptime(start, "%Y-%m-%d").date()
-            e = datetime.strptime(end, "%Y-%m-%d").date()
-            return s <= e
-        except Exception:
+            ms, me = DATE_RE.fullmatch(start), DATE_RE.fullmatch(end)
+            if ms and me:
+                # the day must exist in its month (and there is no year 0);
+                # padded (yyyy, mm, dd) strings then compare in date order
+                for y, m, d in (ms.groups(), me.groups()):
+                    if y == "0000" or not 1 <= int(d) <= _month_len(y, m):
+                        return False
+                return ms.groups() <= me.groups()
+            return _parse_ymd(start) <= _parse_ymd(end)
+        except (TypeError, ValueError):
             return False
 
     def _overlaps_existing(self, rid, start, end) -> bool:
-        from datetime import datetime
-        s_new = datetime.strptime(start, "%Y-%m-%d").date()
-        e_new = datetime.strptime(end, "%Y-%m-%d").date()
-        rows = [r for r in self._read_all_leaves_rows() if r["registry_number"] == rid]
+        s_new = pd.Timestamp(_parse_ymd(start))
+        e_new = pd.Timestamp(_parse_ymd(end))
+        rows = self._read_all_leaves_rows(rid)
         if self._edit_buffer:
             rows = [r for r in rows if not (
                 r["start_date"] == self._edit_buffer["start_date"] and
                 r["end_date"]   == self._edit_buffer["end_date"]   and
                 r["leave_type"] == self._edit_buffer["leave_type"] and
-                (r.get("comments","") == self._edit_buffer.get("comments",""))
+                (r["comments"] == self._edit_buffer.get("comments",""))
             )]
-        for r in rows:
-            try:
-                s = datetime.strptime(r["start_date"], "%Y-%m-%d").date()
-                e = datetime.strptime(r["end_date"], "%Y-%m-%d").date()
-                if s <= e_new and e >= s_new:
-                    return True
-            except Exception:
-                continue
-        return False
+        if not rows:
+            return False
+        # parse all existing ranges in one batch; unparseable dates (NaT) never overlap
+        df = pd.DataFrame(rows, columns=["start_date", "end_date"])
+        s = pd.to_datetime(df["start_date"], format="%Y-%m-%d", errors="coerce")
+        e = pd.to_datetime(df["end_date"], format="%Y-%m-%d", errors="coerce")
+        return bool(((s <= e_new) & (e >= s_new)).any())
 
     # ---------- actions ----------
     def _on_add_or_replace_leave(self):
@@ -833,6 +1162,7 @@ class LeaveManager(ttk.Frame):
             self._delete_row_exact(self._edit_buffer)
 
         msg = add_leave(rid, lt, start, end, note or "")
+        self._leaves_cache.clear()  # add_leave may write to several monthly files
         self._log(msg)
         messagebox.showinfo("Done", msg)
         self._edit_buffer = None
@@ -902,14 +1232,6 @@ class LeaveManager(ttk.Frame):
           - OLD format (daily): column date (deletes all days within the range)
         Returns: (success: bool, affected_files: list[str])
         """
-        from datetime import datetime, timedelta
-
-        def daterange(d1, d2):
-            cur = d1
-            while cur <= d2:
-                yield cur
-                cur += timedelta(days=1)
-
         rid = rec["registry_number"]
         start = rec["start_date"]
         end = rec["end_date"]
@@ -917,9 +1239,9 @@ class LeaveManager(ttk.Frame):
         note = rec.get("comments", "")
 
         try:
-            d_start = datetime.strptime(start, "%Y-%m-%d").date()
-            d_end   = datetime.strptime(end,   "%Y-%m-%d").date()
-        except Exception:
+            d_start = _parse_ymd(start)
+            d_end   = _parse_ymd(end)
+        except (TypeError, ValueError):
             return False, []
 
         success = False
@@ -928,71 +1250,144 @@ class LeaveManager(ttk.Frame):
         if not os.path.exists(LOGS_DIR):
             return False, []
 
-        # Iterate through all daily_leave_*.csv files
-        for filename in os.listdir(LOGS_DIR):
-            if not (filename.startswith("daily_leave_") and filename.endswith(".csv")):
-                continue
-            full = os.path.join(LOGS_DIR, filename)
+        # Iterate through all daily_leave_*.csv files (listed up front: files are rewritten/removed below).
+        # add_leave files every day of a range under the month it starts in, so a monthly
+        # file never holds dates before its month: files after the range's end are skipped.
+        last_month = (d_end.year, d_end.month)
+        paths = []
+        with os.scandir(LOGS_DIR) as it:
+            for e in it:
+                if not (e.name.startswith("daily_leave_") and e.name.endswith(LOG_EXT)):
+                    continue
+                ym = LEAVE_FILE_RE.fullmatch(e.name)
+                if ym and (int(ym[1]), int(ym[2])) > last_month:
+                    continue
+                paths.append(e.path)
+
+        to_remove_dates = None
+        for full in paths:
             try:
-                df = pd.read_csv(full, dtype=str).fillna("")
-            except Exception:
+                with open(full, newline="", encoding="utf-8-sig") as f:
+                    table = [row for row in csv.reader(f) if row]
+            except (OSError, UnicodeError, csv.Error):
+                continue
+            if not table:
+                continue
+            header, body = table[0], table[1:]
+            col = {c: i for i, c in enumerate(header)}
+            reg_i = col.get("registry_number", col.get("registry_id"))
+            width = len(header)
+            if len(col) != width or any(len(row) != width for row in body):
+                # Duplicate headers or ragged rows: let pandas normalize the file
+                if self._delete_row_pandas(full, rid, start, end, ltype, note, d_start, d_end):
+                    success = True
+                    changed_paths.append(full)
+                continue
+            if reg_i is None or "leave_type" not in col:
                 continue
 
-            # Normalize registry column
-            if "registry_number" not in df.columns and "registry_id" in df.columns:
-                df["registry_number"] = df["registry_id"]
-
-            orig_len = len(df)
-
-            if "start_date" in df.columns:
-                # -------- NEW format (ranges) --------
-                # Remove ONLY the exact record (full match)
-                mask = (
-                    (df["registry_number"] == rid) &
-                    (df["start_date"] == start) &
-                    (df["end_date"]   == end) &
-                    (df["leave_type"] == ltype) &
-                    (df.get("comments", "") == note)
-                )
-                if mask.any():
-                    df = df[~mask].reset_index(drop=True)
-
-            elif "date" in df.columns:
-                # -------- OLD format (daily rows) --------
-                # Remove all days of the range that match type/comment
-                to_remove_dates = {d.isoformat() for d in daterange(d_start, d_end)}
-                mask = (
-                    (df["registry_number"] == rid) &
-                    (df["leave_type"] == ltype) &
-                    (df.get("comments", "") == note) &
-                    (df["date"].isin(to_remove_dates))
-                )
-                if mask.any():
-                    df = df[~mask].reset_index(drop=True)
+            # Exact (column, value) matches; a file without comments only matches an empty note
+            checks = [(reg_i, rid), (col["leave_type"], ltype)]
+            if "comments" in col:
+                checks.append((col["comments"], note))
+            elif note:
+                continue
+            if "start_date" in col:
+                # -------- NEW format (ranges): ONLY the exact record --------
+                if "end_date" not in col:
+                    continue
+                checks += [(col["start_date"], start), (col["end_date"], end)]
+                kept = [row for row in body if not all(row[i] == v for i, v in checks)]
+            elif "date" in col:
+                # -------- OLD format (daily rows): all days of the range --------
+                if to_remove_dates is None:
+                    to_remove_dates = set(_iso_days(d_start, d_end).tolist())
+                date_i = col["date"]
+                kept = [row for row in body
+                        if not (row[date_i] in to_remove_dates and all(row[i] == v for i, v in checks))]
+            else:
+                continue
 
             # If changed, write back (or delete if empty - optional)
-            if len(df) != orig_len:
+            if len(kept) != len(body):
                 success = True
                 changed_paths.append(full)
-                if df.empty:
-                    # Optionally: delete the file that became empty
+                self._leaves_cache.pop(full, None)
+                if not kept:
                     try:
                         os.remove(full)
                     except Exception:
                         pass
                 else:
-                    df.to_csv(full, index=False, encoding="utf-8-sig")
+                    _write_leave_rows(full, header, kept)
 
         return success, changed_paths
 
+    def _delete_row_pandas(self, full, rid, start, end, ltype, note, d_start, d_end) -> bool:
+        """pandas variant of the per-file delete in _delete_row_exact, for irregular files."""
+        try:
+            # every column is kept: the file is written back from this frame
+            df = _read_leave_csv(full, dtype=str, encoding='utf-8-sig', na_filter=False)
+        except Exception:
+            return False
+
+        # Normalize registry column; comments is guaranteed so the masks compare columns
+        if "registry_number" not in df.columns and "registry_id" in df.columns:
+            df["registry_number"] = df["registry_id"]
+        if "comments" not in df.columns:
+            df["comments"] = ""
+
+        orig_len = len(df)
+
+        if "start_date" in df.columns:
+            # -------- NEW format (ranges) --------
+            # Remove ONLY the exact record (full match)
+            mask = (
+                (df["registry_number"] == rid) &
+                (df["start_date"] == start) &
+                (df["end_date"]   == end) &
+                (df["leave_type"] == ltype) &
+                (df["comments"] == note)
+            )
+            if mask.any():
+                df = df[~mask].reset_index(drop=True)
+
+        elif "date" in df.columns:
+            # -------- OLD format (daily rows) --------
+            # Remove all days of the range that match type/comment
+            to_remove_dates = _iso_days(d_start, d_end)
+            mask = (
+                (df["registry_number"] == rid) &
+                (df["leave_type"] == ltype) &
+                (df["comments"] == note) &
+                (df["date"].isin(to_remove_dates))
+            )
+            if mask.any():
+                df = df[~mask].reset_index(drop=True)
+
+        # If changed, write back (or delete if empty - optional)
+        if len(df) == orig_len:
+            return False
+        self._leaves_cache.pop(full, None)
+        if df.empty:
+            # Optionally: delete the file that became empty
+            try:
+                os.remove(full)
+            except Exception:
+                pass
+        else:
+            # cells are already strings (dtype=str, na_filter=False): no pandas formatting needed
+            _write_leave_rows(full, df.columns.tolist(), df.itertuples(index=False, name=None))
+        return True
+
     def _apply_filters(self):
         self.filter_month = "" if self.var_f_m.get() == "All" else self.var_f_m.get()
         self.filter_year  = "" if self.var_f_y.get() == "All" else self.var_f_y.get()
-        self._refresh_table_for_current_person()
+        self._schedule_refresh()
 
     def _toggle_sort(self):
         self.sort_asc = not self.sort_asc
-        self._refresh_table_for_current_person()
+        self._schedule_refresh()
 
     def _on_export_leaves_excel(self):
         """Create data/Personnel Leaves.xlsx with a sheet per month (MONTH_YEAR)."""
@@ -1001,8 +1396,7 @@ class LeaveManager(ttk.Frame):
             messagebox.showwarning("Warning", "No leaves found in logs/."); return
 
         # Join with personnel for display
-        pers = load_personnel_df().copy()
-        pers = pers[["registry_number","name","rank","specialty"]]
+        pers = self.model.current()[["registry_number","name","rank","specialty"]]
         df = pd.DataFrame(rows)
         df = df.merge(pers, on="registry_number", how="left")
 
@@ -1015,30 +1409,27 @@ class LeaveManager(ttk.Frame):
         out_path = os.path.join(DATA_DIR, "Personnel Leaves.xlsx")
         os.makedirs(DATA_DIR, exist_ok=True)
 
-        def ym(s):
-            s = (s or "")
-            return (s[0:4], s[5:7]) if len(s) >= 7 else ("", "")
-        year_mon = df["start_date"].apply(ym)
-        df["_year"] = year_mon.apply(lambda t: t[0])
-        df["_mon"]  = year_mon.apply(lambda t: t[1])
-        missing = df["_year"] == ""
-        if missing.any():
-            ym2 = df.loc[missing, "end_date"].apply(ym)
-            df.loc[missing, "_year"] = ym2.apply(lambda t: t[0])
-            df.loc[missing, "_mon"]  = ym2.apply(lambda t: t[1])
+        # Month of each leave from its start date (end date when the start is missing)
+        sd, ed = df["start_date"], df["end_date"]
+        src = sd.where(sd.str.len() >= 7, ed)
+        ok = src.str.len() >= 7
+        df["_year"] = src.str.slice(0, 4).where(ok, "")
+        df["_mon"]  = src.str.slice(5, 7).where(ok, "")
+
+        # Project and rename once; the month keys group the frame without being sheet columns
+        final = df[[
+            "registry_number","rank","specialty","name",
+            "leave_type","start_date","end_date","comments"
+        ]]
+        final.columns = ["Registry No.","Rank","Specialty","Full Name",
+                         "Type","From","To","Comment"]
 
         with pd.ExcelWriter(out_path, engine="xlsxwriter") as writer:
-            for (y, m), g in df.groupby(["_year","_mon"]):
+            # sorted keys keep the sheets in chronological order
+            for (y, m), out in final.groupby([df["_year"], df["_mon"]]):
                 if not y or not m:
                     continue
                 sheet = f"{MONTH_EN.get(m,m)}_{y}"
-                out = g.copy()
-                out = out[[
-                    "registry_number","rank","specialty","name",
-                    "leave_type","start_date","end_date","comments"
-                ]]
-                out.columns = ["Registry No.","Rank","Specialty","Full Name",
-                               "Type","From","To","Comment"]
                 out.to_excel(writer, index=False, sheet_name=sheet)
 
         self._log(f"✅ Export: {out_path}")
@@ -1057,10 +1448,11 @@ class ShiftsManager(ttk.Frame):
     - Export 3 Excels
     """
 
-    def __init__(self, master):
+    def __init__(self, master, model: PersonnelModel):
         super().__init__(master, padding=12)
         os.makedirs(DATA_DIR, exist_ok=True)
         os.makedirs(LOGS_DIR, exist_ok=True)
+        self.model = model
 
         # ---- selections (Year/Month)
         today = pd.Timestamp.today()
@@ -1069,6 +1461,7 @@ class ShiftsManager(ttk.Frame):
 
         # ---- preview cache/result
         self.people = []      # [{'rid':..., 'label':...}, ...]
+        self._label_to_rid = {}  # combobox label -> registry number
         self.result = None      # scheduler result cache for preview/exports
 
         # ---- state for Unavailabilities / Preferences
@@ -1085,25 +1478,6 @@ class ShiftsManager(ttk.Frame):
         self._build_ui()
         self.reload_people()
 
-    def _is_officer(self, rank: str) -> bool:
-        """Return True if rank is considered an officer."""
-        officer_ranks = {
-            "Commander","Commander (M)","Lieutenant Commander","Lieutenant Commander (M)",
-            "Lieutenant","Lieutenant (M)","Lieutenant (E)",
-            "Ensign","Ensign (M)","Ensign (E)"
-        }
-        return str(rank).strip() in officer_ranks
-
-    def _display_name(self, rank: str, specialty: str, name: str) -> str:
-        """Formats a name for display in the preview table."""
-        rank = str(rank).strip()
-        specialty = str(specialty).strip()
-        name = str(name).strip()
-        if self._is_officer(rank):
-            return f"{rank} | {name} HN"
-        spec = f" ({specialty})" if specialty else ""
-        return f"{rank}{spec} | {name}"
-    
     # ---------------- UI ----------------
     def _build_ui(self):
         # Header: Year / Month
@@ -1112,7 +1486,7 @@ class ShiftsManager(ttk.Frame):
         ttk.Label(hdr, text="Year:").pack(side="left")
         ttk.Combobox(hdr, textvariable=self.var_year, values=YEARS, width=8, state="readonly").pack(side="left", padx=(4,12))
         ttk.Label(hdr, text="Month:").pack(side="left")
-        ttk.Combobox(hdr, textvariable=self.var_month, values=[f"{m:02d}" for m in range(1,13)], width=6, state="readonly").pack(side="left", padx=(4,12))
+        ttk.Combobox(hdr, textvariable=self.var_month, values=MONTHS, width=6, state="readonly").pack(side="left", padx=(4,12))
 
         ttk.Button(hdr, text="Initialize (All In Port)", command=self._on_init_month_ormo).pack(side="left", padx=(0,8))
         ttk.Button(hdr, text="Calculate Shifts", command=self._on_compute).pack(side="left", padx=(0,8))
@@ -1216,9 +1590,10 @@ class ShiftsManager(ttk.Frame):
             t = pd.Timestamp.today()
             return int(t.year), int(t.month)
 
-    def reload_people(self):
+    def reload_people(self, df=None):
         """Populate the personnel list for the combobox."""
-        df = load_personnel_df()
+        if df is None:
+            df = self.model.current()
         people = []
         for _, r in df.iterrows():
             rid = str(r["registry_number"]).strip()
@@ -1228,6 +1603,7 @@ class ShiftsManager(ttk.Frame):
             label = f"{rid} | {rk} ({sp}) | {nm}"
             people.append({"rid": rid, "label": label})
         self.people = people
+        self._label_to_rid = {p["label"]: p["rid"] for p in people}
         labels = [p["label"] for p in people]
         self.cb_person["values"] = labels
         if labels and not self.var_person_label.get():
@@ -1278,11 +1654,7 @@ class ShiftsManager(ttk.Frame):
     # ---------------- actions: Unav / Pref ----------------
     def _selected_registry(self) -> str:
         """Find the registry_number from the selected label."""
-        label = self.var_person_label.get().strip()
-        for p in self.people:
-            if p["label"] == label:
-                return p["rid"]
-        return ""
+        return self._label_to_rid.get(self.var_person_label.get().strip(), "")
 
     def _on_add_unav_or_pref(self):
         """Submit unavailabilities or preferences for the selected month."""
@@ -1338,6 +1710,7 @@ class ShiftsManager(ttk.Frame):
     # ---------------- compute / preview / export ----------------
     def _on_compute(self):
         """Run the scheduler for the selected month and show a preview."""
+        from app.scheduler_in_port import make_month_schedule_all
         y, m = self._sel_ym()
         try:
             self.result = make_month_schedule_all(y, m)
@@ -1349,26 +1722,9 @@ class ShiftsManager(ttk.Frame):
 
     def _refresh_preview_from_result(self):
         """Safe preview from self.result."""
-        # FIX 4a: Add these two helper methods right inside this function for clarity and access
-        def _is_officer(rank: str) -> bool:
-            officer_ranks = {
-                "Commander","Commander (M)","Lieutenant Commander","Lieutenant Commander (M)",
-                "Lieutenant","Lieutenant (M)","Lieutenant (E)",
-                "Ensign","Ensign (M)","Ensign (E)"
-            }
-            return str(rank).strip() in officer_ranks
-
-        def _display_name(rank: str, specialty: str, name: str) -> str:
-            rank = str(rank).strip()
-            specialty = str(specialty).strip()
-            name = str(name).strip()
-            if _is_officer(rank):
-                return f"{rank} | {name} HN"
-            spec = f" ({specialty})" if specialty else ""
-            return f"{rank}{spec} | {name}"
-
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
         if not self.result:
             return
 
@@ -1376,14 +1732,15 @@ class ShiftsManager(ttk.Frame):
         assignments = self.result.get("by_watch", {})
         y, m = self._sel_ym()
         _, last_day = monthrange(y, m)
-        
-        WEEKDAY_EN = ["MONDAY","TUESDAY","WEDNESDAY","THURSDAY","FRIDAY","SATURDAY","SUNDAY"]
-        
-        from app.scheduling_prep import WATCH_TYPES as SCHEDULER_WATCH_TYPES
-        
-        for d in range(1, last_day + 1):
-            date_iso = pd.Timestamp(year=y, month=m, day=d).date().isoformat()
-            wname = WEEKDAY_EN[pd.Timestamp(date_iso).weekday()]
+
+        # ISO strings and weekday indexes for the whole month in one vectorized pass
+        rng = pd.date_range(f"{y:04d}-{m:02d}-01", periods=last_day, freq="D")
+        iso_days = rng.strftime("%Y-%m-%d").tolist()
+        weekdays = rng.weekday.tolist()
+
+        rows = []
+        for date_iso, wd in zip(iso_days, weekdays):
+            wname = WEEKDAY_EN[wd]
             
             values = [date_iso, wname]
             
@@ -1400,10 +1757,16 @@ class ShiftsManager(ttk.Frame):
                 
                 values.append(name)
                 
-            self.tree.insert("", "end", values=tuple(values))
+            rows.append(tuple(values))
+
+        # all rows are built first, then inserted in one tight loop of raw Tcl calls
+        tcall, tw = self.tree.tk.call, self.tree._w
+        for vals in rows:
+            tcall(tw, "insert", "", "end", "-values", vals)
 
     def _on_export_all_excels(self):
         """Export 3 Excel files for the selected month, using the result cache (if available)."""
+        from app.scheduler_in_port import export_month_schedule_all
         y, m = self._sel_ym()
         try:
             out_paths = export_month_schedule_all(y, m, self.result)
@@ -1421,26 +1784,31 @@ class App(tk.Tk):
         nb = ttk.Notebook(self)
         nb.pack(fill="both", expand=True)
 
+        # one personnel frame shared by all tabs
+        self.people_model = PersonnelModel()
+
         # Tab 1
-        self.tab1 = PersonnelManager(nb, on_personnel_changed=self._on_people_changed)
+        self.tab1 = PersonnelManager(nb, self.people_model)
         nb.add(self.tab1, text="Personnel")
 
         # Tab 2
-        self.tab2 = LeaveManager(nb)
+        self.tab2 = LeaveManager(nb, self.people_model)
         nb.add(self.tab2, text="Leave")
 
         # Tab 3
-        self.tab3 = ShiftsManager(nb)
+        self.tab3 = ShiftsManager(nb, self.people_model)
         nb.add(self.tab3, text="Shifts")
 
-    def _on_people_changed(self):
+        self.people_model.subscribe(self._on_people_changed)
+
+    def _on_people_changed(self, df):
         # When Personnel changes, we update the other tabs
         try:
-            self.tab2.reload_people()
+            self.tab2.reload_people(df)
         except Exception:
             pass
         try:
-            self.tab3.reload_people()
+            self.tab3.reload_people(df)
         except Exception:
             pass
 
@@ -1,24 +1,52 @@
 
 # app/i18n_display_mapping.py
 # Lightweight i18n layer that maps Greek <-> English for domain values.
-# Reads mapping CSVs from ./i18n_maps/*.csv. If a mapping is missing, it falls back to identity.
+# Reads mapping CSVs from ./i18n_maps/*.csv. If a mapping is missing, values pass through unchanged.
 
 import os
+import pickle
+import re
 import pandas as pd
 
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Duty list separators: "; " and the legacy "|"
+_SEP_RE = re.compile(r"[;|]")
+
+def _load_pairs(path):
+    """
+    el -> en pairs of one mapping CSV. The parsed dict is pickled next to the CSV
+    (<name>.csv.pkl) with the CSV's mtime/size and reused until the CSV changes;
+    any problem with the cache file falls back to parsing the CSV.
+    """
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cache_path = path + ".pkl"
+    try:
+        with open(cache_path, "rb") as f:
+            cached_stamp, pairs = pickle.load(f)
+        if cached_stamp == stamp:
+            return pairs
+    except Exception:
+        pass
+    df = pd.read_csv(path, dtype=str).fillna("").reindex(columns=["el", "en"], fill_value="")
+    keep = df["el"] != ""
+    pairs = {el: en or el for el, en in zip(df.loc[keep, "el"].tolist(), df.loc[keep, "en"].tolist())}
+    try:
+        with open(cache_path, "wb") as f:
+            pickle.dump((stamp, pairs), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+    return pairs
+
 def _read_map(filename, base_values):
     path = os.path.join(DATA_DIR, "i18n_maps", filename)
+    # no mapping file: an empty dict means pass-through (m.get(v, v) returns v)
+    if not os.path.exists(path):
+        return {}
     # start with identity mapping so unmapped values just pass through
     m = {v: v for v in base_values}
-    if os.path.exists(path):
-        df = pd.read_csv(path, dtype=str).fillna("")
-        for _, r in df.iterrows():
-            el = r.get("el", "")
-            en = r.get("en", "")
-            if el:
-                m[el] = en or el
+    m.update(_load_pairs(path))
     return m
 
 def _invert_map(m):
@@ -38,34 +66,34 @@ class I18N:
         self._spec_inv = _invert_map(self.spec_map)
         self._duty_inv = _invert_map(self.duty_map)
         self._watch_inv = _invert_map(self.watch_map)
+        # category -> map dispatch tables (one dict lookup instead of an if-chain per call)
+        self._disp = {"rank": self.rank_map, "specialty": self.spec_map,
+                      "duty": self.duty_map, "watch": self.watch_map}
+        self._stor = {"rank": self._rank_inv, "specialty": self._spec_inv,
+                      "duty": self._duty_inv, "watch": self._watch_inv}
 
     def to_display(self, cat, val):
-        if cat == "rank": return self.rank_map.get(val, val)
-        if cat == "specialty": return self.spec_map.get(val, val)
-        if cat == "duty": return self.duty_map.get(val, val)
-        if cat == "watch": return self.watch_map.get(val, val)
-        return val
+        m = self._disp.get(cat)
+        return val if m is None else m.get(val, val)
 
     def to_storage(self, cat, val):
-        if cat == "rank": return self._rank_inv.get(val, val)
-        if cat == "specialty": return self._spec_inv.get(val, val)
-        if cat == "duty": return self._duty_inv.get(val, val)
-        if cat == "watch": return self._watch_inv.get(val, val)
-        return val
+        m = self._stor.get(cat)
+        return val if m is None else m.get(val, val)
 
     def seq_display(self, cat, seq):
-        return [self.to_display(cat, x) for x in seq]
+        m = self._disp.get(cat)
+        return list(seq) if m is None else [m.get(v, v) for v in seq]
 
     def duties_display_to_storage_field(self, s):
         """Convert a '; '-separated display string to storage Greek 'duty' field."""
         s = (s or "").strip()
         if not s: return ""
-        parts = [p.strip() for p in s.replace("|",";").split(";") if p.strip()]
+        parts = [p for p in (x.strip() for x in _SEP_RE.split(s)) if p]
         el_parts = [self.to_storage("duty", p) for p in parts]
         return "; ".join(el_parts)
 
     def duties_storage_to_display_list(self, s):
         s = (s or "").strip()
         if not s: return []
-        parts = [p.strip() for p in s.replace("|",";").split(";") if p.strip()]
+        parts = [p for p in (x.strip() for x in _SEP_RE.split(s)) if p]
         return [self.to_display("duty", p) for p in parts]
@@ -5,8 +5,7 @@ One-time migration: convert Greek domain values in data/personnel.csv to English
 using i18n_maps/*.csv. Makes a timestamped backup first.
 """
 
-import os, sys, datetime
-import pandas as pd
+import os, re, sys, csv, shutil, datetime
 
 # Assume this script is placed under the project root or the app/ folder.
 HERE = os.path.dirname(os.path.abspath(__file__))
@@ -15,50 +14,60 @@ DATA_DIR = os.path.join(APP_DIR)
 MAP_DIR  = os.path.join(APP_DIR, "i18n_maps")
 CSV_PATH = os.path.join(APP_DIR, "data", "personnel.csv")
 
+# Duty list separators: "; " and the legacy "|"
+_SEP_RE = re.compile(r"[;|]")
+
 def read_map(name):
     path = os.path.join(MAP_DIR, f"{name}.csv")
     if not os.path.exists(path):
         raise SystemExit(f"Missing mapping file: {path}")
-    df = pd.read_csv(path, dtype=str).fillna("")
     m = {}
-    for _, r in df.iterrows():
-        el = r.get("el","").strip()
-        en = r.get("en","").strip()
-        if el:
-            m[el] = en or el
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for r in csv.DictReader(f):
+            el = (r.get("el") or "").strip()
+            if el:
+                m[el] = (r.get("en") or "").strip() or el
     return m
 
 def main():
     if not os.path.exists(CSV_PATH):
         raise SystemExit(f"Not found: {CSV_PATH}")
 
-    df = pd.read_csv(CSV_PATH, dtype=str).fillna("")
-
     rank_map = read_map("ranks")
     spec_map = read_map("specialties")
     duty_map = read_map("duties")
     watch_map = read_map("watch_codes")
 
     def map_duty_field(s):
-        s = (s or "").strip()
-        if not s: return ""
-        parts = [p.strip() for p in s.replace("|",";").split(";") if p.strip()]
-        return "; ".join([duty_map.get(p, p) for p in parts])
+        # "a; b" or legacy "a|b" -> mapped duties re-joined with "; "
+        parts = (p.strip() for p in _SEP_RE.split(s))
+        return "; ".join(duty_map.get(p, p) for p in parts if p)
 
-    # backup
+    # backup: byte-for-byte copy of the original file
     ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
     backup = os.path.join(APP_DIR, "data", f"personnel_BACKUP_EL_{ts}.csv")
-    df.to_csv(backup, index=False, encoding="utf-8-sig")
-
-    # migrate columns
-    if "rank" in df.columns: df["rank"] = df["rank"].map(lambda v: rank_map.get(v, v))
-    if "specialty" in df.columns: df["specialty"] = df["specialty"].map(lambda v: spec_map.get(v, v))
-    if "duty" in df.columns: df["duty"] = df["duty"].map(map_duty_field)
-    for k in ("primary_shift","alt_shift","at_sea_shift"):
-        if k in df.columns: df[k] = df[k].map(lambda v: watch_map.get(v, v))
+    shutil.copy2(CSV_PATH, backup)
 
+    # migrate columns, streaming row by row from the backup into personnel.csv
     out = os.path.join(APP_DIR, "data", "personnel.csv")
-    df.to_csv(out, index=False, encoding="utf-8-sig")
+    remaps = (("rank", rank_map), ("specialty", spec_map), ("primary_shift", watch_map),
+              ("alt_shift", watch_map), ("at_sea_shift", watch_map))
+    with open(backup, newline="", encoding="utf-8-sig") as fi, \
+         open(out, "w", newline="", encoding="utf-8-sig") as fo:
+        r = csv.DictReader(fi)
+        fields = r.fieldnames or []
+        remaps = [(k, m) for k, m in remaps if k in fields]
+        w = csv.DictWriter(fo, fieldnames=fields, restval="", extrasaction="ignore",
+                           lineterminator=os.linesep)
+        w.writeheader()
+        for row in r:
+            for k, m in remaps:
+                v = row[k] or ""
+                row[k] = m.get(v, v)
+            if "duty" in fields:
+                row["duty"] = map_duty_field(row["duty"] or "")
+            w.writerow(row)
+
     print("Migration complete.")
     print("Backup:", backup)
     print("Updated:", out)
@@ -4,7 +4,9 @@
 
 from __future__ import annotations
 from .i18n_display_mapping import I18N
-from .constants import RANKS, SPECIALTIES, DUTIES
+from .constants import RANKS, SPECIALTIES, DUTIES, OFFICER_RANKS
+import csv
+import os
 from pathlib import Path
 from typing import Dict, List, Tuple
 import pandas as pd
@@ -12,15 +14,24 @@ import pandas as pd
 from .store import DATA_DIR, save_to_csv, load_csv
 from .constants import RANKS, SPECIALTIES, DUTIES
 
-# --- Seniority order: lower index = more senior (RANKS is already high→low) ---
-SENIORITY_ORDER = {rank: i for i, rank in enumerate(RANKS)}
+PERSONNEL_FILE = "personnel.csv"
 
-def _seniority_key(rank: str) -> int:
-    """Return integer priority for rank; smaller means more senior."""
-    # THIS IS THE FIX: Directly use the English rank as the key.
-    return SENIORITY_ORDER.get(str(rank).strip(), 10_000)
+# Registry columns, in file order
+_FIELDS = (
+    "name","rank","specialty","duty",
+    "primary_shift","alt_shift","at_sea_shift",
+    "height","weight","registry_number","address","phone",
+    "marital_status","children","pye_expiration","notes"
+)
 
-PERSONNEL_FILE = "personnel.csv"
+# Seniority as an ordered categorical (built once): RANKS is already high→low
+_RANK_DTYPE = pd.CategoricalDtype(categories=RANKS, ordered=True)
+
+# Membership sets for payload validation (built once)
+_RANKS_SET = frozenset(RANKS)
+_SPEC_SET = frozenset(SPECIALTIES)
+_DUTY_SET = frozenset(DUTIES)
+_WATCH_SET = frozenset({"ΑΦ","ΥΦΜ","ΒΥΦΜ","ΥΦ","ΒΥΦ"})
 
 # ----- Helpers ---------------------------------------------------------------
 
@@ -28,13 +39,7 @@ def _is_officer(rank: str) -> bool:
     """
     Officers are from Commander down to Ensign (including 'M'/'E' variants).
     """
-    officer_set = {
-        "Commander","Commander (M)",
-        "Lieutenant Commander","Lieutenant Commander (M)",
-        "Lieutenant","Lieutenant (M)","Lieutenant (E)",
-        "Ensign","Ensign (M)","Ensign (E)"
-    }
-    return rank in officer_set
+    return rank in OFFICER_RANKS
 
 def _validate_person_payload(p: Dict) -> Tuple[bool, str]:
     """
@@ -46,38 +51,101 @@ def _validate_person_payload(p: Dict) -> Tuple[bool, str]:
             return False, f"The field «{r}» is required."
 
     # THIS IS THE FIX: Validate directly against the English lists.
-    if str(p['rank']) not in RANKS:
+    if str(p['rank']) not in _RANKS_SET:
         return False, "Invalid rank."
-    if str(p['specialty']) not in SPECIALTIES:
+    if str(p['specialty']) not in _SPEC_SET:
         return False, "Invalid specialty."
     duty = str(p.get('duty','')).strip()
-    if duty and duty not in DUTIES:
+    if duty and duty not in _DUTY_SET:
         return False, f"Invalid duty: {duty}"
     for k in ("primary_shift", "alt_shift"):
         v = str(p.get(k, '')).strip()
-        if v and v not in {"ΑΦ","ΥΦΜ","ΒΥΦΜ","ΥΦ","ΒΥΦ"}:
+        if v and v not in _WATCH_SET:
             return False, f"Invalid in-port watch in field «{k}»."
     return True, "OK"
 
-def _personnel_df() -> pd.DataFrame:
+# Last parsed registry and its registry_number index, keyed on the CSV's (mtime_ns, size)
+_CACHE = {"stamp": None, "df": None, "idx": None}
+
+def _personnel_stamp():
+    try:
+        st = (DATA_DIR / PERSONNEL_FILE).stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _registry_index(df: pd.DataFrame) -> Dict[str, list]:
+    """registry_number -> index labels of the rows carrying it."""
+    idx = {}
+    if "registry_number" in df.columns:
+        for rid, label in zip(df["registry_number"].astype(str).tolist(), df.index.tolist()):
+            idx.setdefault(rid, []).append(label)
+    return idx
+
+def _personnel_cached() -> Tuple[pd.DataFrame, Dict[str, list]]:
     """
-    Load current personnel registry as a DataFrame with stable columns.
+    Current personnel registry (stable columns) and its registry_number index.
+    Both are reused while the CSV is unchanged; they are shared, so do not mutate them.
     """
+    stamp = _personnel_stamp()
+    if stamp is not None and _CACHE["stamp"] == stamp:
+        return _CACHE["df"], _CACHE["idx"]
     df = load_csv(PERSONNEL_FILE)
     if df.empty:
-        df = pd.DataFrame(columns=[
-            "name","rank","specialty","duty",
-            "primary_shift","alt_shift","at_sea_shift",
-            "height","weight","registry_number","address","phone",
-            "marital_status","children","pye_expiration","notes"
-        ])
+        df = pd.DataFrame(columns=list(_FIELDS))
     for c in df.columns: # Ensure all expected columns exist
         if c not in df.columns:
             df[c] = ""
-    return df
+    idx = _registry_index(df)
+    if stamp is not None:
+        _CACHE.update(stamp=stamp, df=df, idx=idx)
+    return df, idx
+
+def _personnel_df() -> pd.DataFrame:
+    """
+    Load current personnel registry as a DataFrame with stable columns.
+    """
+    return _personnel_cached()[0].copy()
 
 def _save_personnel_df(df: pd.DataFrame) -> None:
     save_to_csv(df.to_dict(orient="records"), PERSONNEL_FILE)
+    _CACHE["stamp"] = None
+
+def _insert_append(row: Dict) -> bool:
+    """
+    Append one new person to the registry CSV instead of rewriting it.
+    Returns False (nothing written) when the file's header does not cover the row's
+    fields or the file does not end with a newline; the caller then rewrites the table.
+    """
+    path = DATA_DIR / PERSONNEL_FILE
+    if not path.exists() or path.stat().st_size == 0:
+        with path.open("w", newline="", encoding="utf-8-sig") as f:
+            w = csv.writer(f, lineterminator=os.linesep)
+            w.writerow(list(row))
+            w.writerow(list(row.values()))
+        _CACHE["stamp"] = None
+        return True
+    with path.open("rb") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            return False
+    with path.open(newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), [])
+    if len(set(header)) != len(header) or not set(row) <= set(header):
+        return False
+    with path.open("a", newline="", encoding="utf-8") as f:
+        csv.writer(f, lineterminator=os.linesep).writerow([row.get(c, "") for c in header])
+    _CACHE["stamp"] = None
+    return True
+
+def _update_inplace(df: pd.DataFrame, labels: list, row: Dict) -> None:
+    """Overwrite the matching person's fields (rows at index labels) and rewrite the registry CSV."""
+    for c in row:
+        if c not in df.columns:
+            df[c] = ""
+    # positional write: row positions from the index labels, one column indexer
+    df.iloc[df.index.get_indexer(labels), df.columns.get_indexer(list(row))] = list(row.values())
+    _save_personnel_df(df)
 
 # ----- Public API ------------------------------------------------------------
 
@@ -89,41 +157,23 @@ def add_or_update_person(payload: Dict) -> str:
     if not ok:
         return f"❌ Error: {msg}"
 
-    df = _personnel_df()
+    df, idx = _personnel_cached()
 
     # Build clean row
-    row = {
-        "name": str(payload["name"]).strip(),
-        "rank": str(payload.get('rank','')).strip(),
-        "specialty": str(payload.get('specialty','')).strip(),
-        "duty": str(payload.get('duty','')).strip(),
-        "primary_shift": str(payload.get("primary_shift","")).strip(),
-        "alt_shift": str(payload.get("alt_shift","")).strip(),
-        "at_sea_shift": str(payload.get('at_sea_shift','')).strip(),
-        "height": str(payload.get("height","")).strip(),
-        "weight": str(payload.get("weight","")).strip(),
-        "registry_number": str(payload.get("registry_number","")).strip(),
-        "address": str(payload.get("address","")).strip(),
-        "phone": str(payload.get("phone","")).strip(),
-        "marital_status": str(payload.get("marital_status","")).strip(),
-        "children": str(payload.get("children","")).strip(),
-        "pye_expiration": str(payload.get("pye_expiration","")).strip(),
-        "notes": str(payload.get("notes","")).strip(),
-    }
+    row = {k: str(payload.get(k, "")).strip() for k in _FIELDS}
     
     if _is_officer(row["rank"]):
         row["primary_shift"], row["alt_shift"] = "", ""
 
-    mask = (df["registry_number"].astype(str) == row["registry_number"])
-    if mask.any():
-        df.loc[mask, list(row.keys())] = list(row.values())
-        msg = "✅ Personnel update completed."
-    else:
-        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-        msg = "✅ Personnel registration completed."
-    
-    _save_personnel_df(df)
-    return msg
+    labels = idx.get(row["registry_number"])
+    if labels:
+        _update_inplace(df.copy(), labels, row)
+        return "✅ Personnel update completed."
+
+    # New person: append one line; rewrite the whole table only if the file cannot take it
+    if not _insert_append(row):
+        _save_personnel_df(pd.concat([df, pd.DataFrame([row])], ignore_index=True))
+    return "✅ Personnel registration completed."
 
 def list_personnel() -> pd.DataFrame:
     """
@@ -132,6 +182,7 @@ def list_personnel() -> pd.DataFrame:
     df = _personnel_df()
     if df.empty:
         return df
-    df["__k"] = df["rank"].apply(_seniority_key)
+    # Integer seniority codes; ranks outside RANKS (code -1 / NaN) sort last
+    df["__k"] = df["rank"].astype(str).str.strip().astype(_RANK_DTYPE)
     df = df.sort_values(["__k", "name"], ascending=[True, True]).drop(columns="__k")
     return df
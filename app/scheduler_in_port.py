@@ -1,39 +1,44 @@
-# app/scheduler_in_port.py (DEBUGGING VERSION)
+# app/scheduler_in_port.py
 # -----------------------------------------------------------------------------
-# This version contains extra print statements to diagnose the "blank schedule" issue.
+# In-port scheduler for all watch types. Diagnostics for the "blank schedule"
+# issue go to the module logger at DEBUG level (silent unless enabled).
 # -----------------------------------------------------------------------------
 
 from __future__ import annotations
 from .i18n_display_mapping import I18N
-from .constants import RANKS, SPECIALTIES, DUTIES
+from .constants import RANKS, SPECIALTIES, DUTIES, OFFICER_RANKS
 
+import heapq
+import logging
+import sys
 from pathlib import Path
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
-from openpyxl.styles import PatternFill, Border, Side
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 
 # Project-local helpers and rules
-from .scheduling_prep import day_availability, WATCH_TYPES, _seniority_key
+from .scheduling_prep import load_month_frames, day_availability_from_ctx, WATCH_TYPES, _seniority_key
 from .i18n_display_mapping import I18N
 from .constants import RANKS, SPECIALTIES, DUTIES
+from .store import log_path
 from .scheduler_rules import (
     MAX_PER_MONTH, DUTY_NEVER, DUTY_WEEKDAY_ONLY,
-    is_weekend, is_weekday, is_holiday, weekday_name_gr, two_day_gap_ok
+    is_weekend, is_holiday, weekday_name_gr
 )
 
+log = logging.getLogger(__name__)
+
 # ------------------------- Name formatting helpers ---------------------------
 
 I18N_SCH = I18N(RANKS, SPECIALTIES, DUTIES, ["", "AF","YF","YFM","BYFM","BYF"])
 
 def _is_officer(rank: str) -> bool:
-    officers = {
-        "Commander","Commander (M)","Lieutenant Commander","Lieutenant Commander (M)",
-        "Lieutenant","Lieutenant (M)","Lieutenant (E)",
-        "Ensign","Ensign (M)","Ensign (E)"
-    }
-    return str(rank).strip() in officers
+    return str(rank).strip() in OFFICER_RANKS
 
 def _display_name(rank: str, specialty: str, name: str) -> str:
     rank = I18N_SCH.to_storage('rank', str(rank).strip())
@@ -44,6 +49,20 @@ def _display_name(rank: str, specialty: str, name: str) -> str:
     spec = f" ({specialty})" if specialty else ""
     return f"{rank}{spec} | {name}"
 
+# ------------------------- Rank / duty lookup tables -------------------------
+
+# Integer ids for ranks and duties, assigned once at import. Strings outside the
+# tables get the extra last id: no monthly ceiling (99) and no duty flags.
+_RANK_ID = {r: i for i, r in enumerate(dict.fromkeys([*RANKS, *MAX_PER_MONTH]))}
+_CEILING = np.array([MAX_PER_MONTH.get(r, 99) for r in _RANK_ID] + [99], dtype=np.int32)
+
+_NEVER, _WEEKDAY_ONLY = 1, 2
+_DUTY_ID = {d: i for i, d in enumerate(dict.fromkeys([*DUTIES, *sorted(DUTY_NEVER),
+                                                      *sorted(DUTY_WEEKDAY_ONLY)]))}
+_DUTY_FLAGS = np.zeros(len(_DUTY_ID) + 1, np.uint8)
+_DUTY_FLAGS[[_DUTY_ID[d] for d in DUTY_NEVER]] |= _NEVER
+_DUTY_FLAGS[[_DUTY_ID[d] for d in DUTY_WEEKDAY_ONLY]] |= _WEEKDAY_ONLY
+
 # ------------------------------ Data loading ---------------------------------
 
 def _load_people_map() -> dict:
@@ -52,191 +71,394 @@ def _load_people_map() -> dict:
         return {}
     people = pd.read_csv(people_path, dtype=str, encoding='utf-8-sig').fillna("")
     out = {}
-    for _, r in people.iterrows():
-        key = str(r.get("registry_number", "")).strip()
+    for r in people.to_dict(orient="records"):
+        # fields are stripped (and interned) once here, not on every lookup later
+        row = {k: sys.intern(v.strip()) if isinstance(v, str) else v for k, v in r.items()}
+        key = row.get("registry_number", "")
         if key:
-            out[key] = r.to_dict()
+            row["rank_id"] = _RANK_ID.get(row.get("rank", ""), len(_RANK_ID))
+            row["duty_id"] = _DUTY_ID.get(row.get("duty", ""), len(_DUTY_ID))
+            out[key] = row
     return out
 
 # ---------------------------- Pools & ordering -------------------------------
 
-def _primary_pool(info: dict, watch: str, people_map: dict, af_mode: bool = False) -> list[dict]:
-    base = info.get("pools", {}).get(watch, [])
-    out = []
-    print(f"DEBUG: Filtering primary pool for watch '{watch}'. Initial size: {len(base)}.")
-    for p in base:
-        rid = str(p.get("registry_id", "")).strip()
-        row = people_map.get(rid)
-        if row is None:
-            continue
-        duty = str(row.get("duty", "")).strip()
-        if duty in DUTY_NEVER:
-            continue
-        
-        primary_shift = str(row.get("primary_shift",'')).strip()
-        if primary_shift != watch:
-            # print(f"  - DEBUG: Excluding {p.get('name')} because primary_shift is '{primary_shift}' not '{watch}'.")
+def _eligible_by_watch(people_map: dict) -> dict[str, dict[str, str]]:
+    """
+    {watch: {registry_id: duty}} for everyone whose primary shift is that watch,
+    leaving out never-scheduled duties. Built once per month from people_map.
+    """
+    out = {w: {} for w in WATCH_TYPES}
+    for rid, row in people_map.items():
+        if _DUTY_FLAGS[row["duty_id"]] & _NEVER:
             continue
-        
-        q = dict(p)
-        if af_mode:
-            q["duty"] = duty
-        out.append(q)
-    print(f"DEBUG: Final primary pool size for '{watch}': {len(out)}.")
+        duty = row.get("duty", "")
+        primary_shift = row.get("primary_shift", "")
+        if primary_shift in out:
+            out[primary_shift][rid] = duty
     return out
 
-def _sort_af_youngest_first(pool: list[dict]) -> list[dict]:
-    return sorted(pool, key=lambda p: (_seniority_key(p["rank"]), str(p["name"])), reverse=True)
-
-def _sort_fair_non_af(pool: list[dict], counters: dict) -> list[dict]:
-    def key(p):
+def _day_pool(info: dict, watch: str, stats: _MonthCounters,
+              duties: dict[str, str]) -> tuple[dict[int, dict], np.ndarray]:
+    """
+    The day's pool for watch, kept to the registry ids in duties (one _eligible_by_watch
+    entry): {person index: pool dict} (first entry per registry id) and the same people
+    as a boolean mask over all person indexes.
+    """
+    today = {}
+    idx = stats.idx
+    for p in info.get("pools", {}).get(watch, []):
         rid = p["registry_id"]
-        tot = counters.get(rid, {}).get("total", 0)
-        return (tot, _seniority_key(p["rank"]), str(p["name"]))
-    return sorted(pool, key=key)
+        if rid in duties:
+            today.setdefault(idx[rid], p)
+    avail = np.zeros(len(stats.rids), bool)
+    avail[list(today)] = True
+    return today, avail
 
-# ------------------------------ Date constraints -----------------------------
+def _person_name(row: dict) -> str:
+    """Name used for tiebreaks: the registry's name column, or fullname as in day_availability."""
+    return str(row["name"] if "name" in row else row.get("fullname", ""))
 
-def _is_holiday_like(date_iso: str) -> bool:
-    return is_holiday(date_iso) or is_weekend(date_iso)
+def _youngest_first(rids, people_map: dict, stats: _MonthCounters) -> np.ndarray:
+    """
+    Person indexes of rids, most junior first (reverse seniority, then reverse name),
+    fixed for the month. Ties keep file order, as the sorted day pools did.
+    """
+    rids = list(rids)
+    keys = [(_seniority_key(people_map[r].get("rank", "")), _person_name(people_map[r]))
+            for r in rids]
+    order = sorted(range(len(rids)), key=keys.__getitem__, reverse=True)
+    return np.array([stats.idx[rids[k]] for k in order], dtype=np.int32)
 
-def _ok_person_on_date(rid: str, rank: str, duty: str, date_iso: str, counters: dict,
-                       weekend_cap: bool = True, holiday_cap: bool = True, weekday_only: bool = False) -> bool:
-    if weekday_only and not is_weekday(date_iso):
-        return False
+def _fair_heap(rids, people_map: dict, stats: _MonthCounters) -> list[tuple]:
+    """
+    Min-heap of (total, seniority, name, index, rid) for one non-AF watch, seeded once
+    per month. Same order as sorting the day's pool by least total duties, then
+    seniority, then name (file order breaks full ties, as in day_availability's pools).
+    """
+    heap = []
+    for rid in rids:
+        row = people_map[rid]
+        heap.append((0, _seniority_key(row.get("rank", "")), _person_name(row), stats.idx[rid], rid))
+    heapq.heapify(heap)
+    return heap
+
+def _pick_fair(heap: list[tuple], ok: np.ndarray) -> int | None:
+    """
+    Pop candidates in fairness order until one with ok[index] set comes up and return
+    their person index. Everyone popped goes back unchanged except the picked person,
+    who goes back with total + 1.
+    """
+    if not ok.any():
+        return None
+    popped = []
+    while not ok[heap[0][3]]:
+        popped.append(heapq.heappop(heap))
+    e = heap[0]
+    heapq.heapreplace(heap, (e[0] + 1,) + e[1:])
+    for e2 in popped:
+        heapq.heappush(heap, e2)
+    return e[3]
+
+# ------------------------------ Duty counters --------------------------------
+
+class _MonthCounters:
+    """
+    Per-person duty counters for one month, as parallel NumPy arrays indexed by
+    person (registry ids are mapped to indexes once). as_dict() rebuilds the
+    {rid: {...}} "counters" structure the exporters read.
 
-    ceiling = MAX_PER_MONTH.get(str(rank).strip(), 99) # Using 99 as a high default
-    tot = counters.get(rid, {}).get("total", 0)
-    if tot >= ceiling:
-        return False
+    Assigned days are kept only as one int bitmask per person (bit = day number
+    counted from two days before the first date), so the two-day gap rule is a
+    single AND against the five bits centred on the candidate day; as_dict()
+    decodes the masks back into the "dates" sets.
 
-    is_wknd = is_weekend(date_iso)
-    is_hol  = is_holiday(date_iso)
-    wknd_cnt = counters.get(rid, {}).get("wknd", 0)
-    hol_cnt  = counters.get(rid, {}).get("hol_real", 0)
+    The month's per-day facts (weekend, holiday, bit masks) are computed once and
+    addressed by the day's position in dates (day_i).
+    """
 
-    if weekend_cap and is_wknd and wknd_cnt >= 2:
-        return False
-    if holiday_cap and is_hol and hol_cnt >= 1:
-        return False
+    def __init__(self, people_map: dict, dates):
+        self.rids = list(people_map)
+        self.idx = {rid: i for i, rid in enumerate(self.rids)}
+        n, nw = len(self.rids), len(WATCH_TYPES)
+        # monthly ceiling by rank id (99: no ceiling for unknown ranks)
+        self.ceiling = _CEILING[np.fromiter((people_map[r]["rank_id"] for r in self.rids),
+                                            np.intp, count=n)]
+        self.total = np.zeros(n, np.int32)
+        self.wknd = np.zeros(n, np.int32)
+        self.hol = np.zeros(n, np.int32)        # weekend or holiday
+        self.hol_real = np.zeros(n, np.int32)   # holidays only
+        self.per_watch = np.zeros((nw, n), np.int32)
+        self.hol_watch = np.zeros((nw, n), np.int32)
+        self.first = {}  # person index -> picked person dict, in first-assignment order
+
+        # per-day flags; dates that do not parse stay invalid (valid=False)
+        self.day_iso = list(dates)
+        nd = len(self.day_iso)
+        self.valid = np.zeros(nd, bool)
+        self.is_wknd = np.zeros(nd, bool)
+        self.is_hol = np.zeros(nd, bool)
+        ords = [None] * nd
+        for k, d in enumerate(self.day_iso):
+            try:
+                dt = datetime.fromisoformat(d)
+                hol = is_holiday(d)
+            except ValueError:
+                continue
+            ords[k] = dt.toordinal()
+            self.valid[k] = True
+            self.is_wknd[k] = dt.weekday() >= 5  # 5=Saturday, 6=Sunday
+            self.is_hol[k] = hol
+        base = min((o for o in ords if o is not None), default=0) - 2
+        self.day_mask = [0 if o is None else 1 << (o - base) for o in ords]
+        self.gap_mask = [0 if o is None else 0b11111 << (o - base - 2) for o in ords]
+        self.bit_iso = {}  # bit number -> ISO date, to read assigned dates back off a mask
+        for o, d in zip(ords, self.day_iso):
+            if o is not None:
+                self.bit_iso.setdefault(o - base, d)
+        # a month fits in int64 bits; a ship file spanning more falls back to Python ints
+        span = max((o for o in ords if o is not None), default=base) - base
+        self.dates_mask = np.zeros(n, np.int64 if span < 60 else object)
+
+    def assign(self, i: int, p: dict, watch: str, day_i: int) -> None:
+        w = WATCH_TYPES.index(watch)
+        self.first.setdefault(i, p)
+        self.total[i] += 1
+        self.per_watch[w, i] += 1
+        wknd, hol = self.is_wknd[day_i], self.is_hol[day_i]
+        if wknd:
+            self.wknd[i] += 1
+        if hol or wknd:
+            self.hol[i] += 1
+            self.hol_watch[w, i] += 1
+        if hol:
+            self.hol_real[i] += 1
+        self.dates_mask[i] |= self.day_mask[day_i]
+
+    def _dates_of(self, i: int) -> set[str]:
+        """ISO dates assigned to person i, decoded from their bitmask."""
+        out, m = set(), int(self.dates_mask[i])
+        while m:
+            low = m & -m
+            out.add(self.bit_iso[low.bit_length() - 1])
+            m ^= low
+        return out
+
+    def as_dict(self) -> dict:
+        out = {}
+        for i, p in self.first.items():
+            out[self.rids[i]] = {
+                "name": p["name"], "rank": p["rank"], "specialty": p["specialty"],
+                "total": int(self.total[i]), "wknd": int(self.wknd[i]),
+                "hol": int(self.hol[i]), "hol_real": int(self.hol_real[i]),
+                "dates": self._dates_of(i),
+                "per_watch": dict(zip(WATCH_TYPES, self.per_watch[:, i].tolist())),
+                "hol_watch": dict(zip(WATCH_TYPES, self.hol_watch[:, i].tolist())),
+            }
+        return out
 
-    prev_dates = counters.get(rid, {}).get("dates", set())
-    if not two_day_gap_ok(prev_dates, date_iso):
-        return False
+# ------------------------------ Date constraints -----------------------------
 
-    return True
+def _feasible(stats: _MonthCounters, day_i: int, used_today: np.ndarray) -> np.ndarray:
+    """
+    Boolean mask over all people: who can take day dates[day_i]. One vectorized pass
+    over the counter arrays for: not already on duty today, monthly ceiling by rank,
+    weekend cap (2), holiday cap (1) and the two-day gap.
+    """
+    ok = ~used_today & (stats.total < stats.ceiling)
+    ok &= (stats.dates_mask & stats.gap_mask[day_i]) == 0
+    if stats.is_wknd[day_i]:
+        ok &= stats.wknd < 2
+    if stats.is_hol[day_i]:
+        ok &= stats.hol_real < 1
+    return ok
+
+def _first_in_order(order: np.ndarray, ok: np.ndarray) -> int | None:
+    """First person index in order (a priority-ordered index array) with ok set, or None."""
+    hits = ok[order]
+    return int(order[hits.argmax()]) if hits.any() else None
 
 # ------------------------------ Core scheduler -------------------------------
 
+# Finished schedules keyed on (year, month, input file stamps); the oldest entry is
+# dropped once the cap is reached. Results are shared, so callers must not mutate them.
+_MONTH_CACHE: dict[tuple, dict] = {}
+_MONTH_CACHE_MAX = 8
+
+def _input_stamps(year: int, month: int) -> tuple:
+    """(path, mtime_ns, size) of every file the month's schedule reads; missing files stamp as None."""
+    paths = [Path("data") / "personnel.csv"]
+    paths += [log_path(name, year, month)
+              for name in ("ship_status", "daily_leave", "daily_cannot", "daily_prefer", "holidays")]
+    out = []
+    for p in paths:
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            out.append((str(p.resolve()), None))
+            continue
+        out.append((str(p.resolve()), st.st_mtime_ns, st.st_size))
+    return tuple(out)
+
 def make_month_schedule_all(year: int, month: int) -> dict:
-    print("\n" + "="*50)
-    print(f"DEBUG: STARTING SHIFT CALCULATION for {year}-{month:02d}")
-    print("="*50)
+    """
+    Schedule all in-port watches for the month. Reruns with unchanged input files
+    (same mtime and size) return the cached result instead of recomputing it.
+    """
+    key = (year, month, _input_stamps(year, month))
+    result = _MONTH_CACHE.get(key)
+    if result is None:
+        result = _schedule_month(year, month)
+        if len(_MONTH_CACHE) >= _MONTH_CACHE_MAX:
+            del _MONTH_CACHE[next(iter(_MONTH_CACHE))]
+        _MONTH_CACHE[key] = result
+    return result
+
+def _schedule_month(year: int, month: int) -> dict:
+    # checked once: the per-day diagnostics below cost nothing when DEBUG is off
+    debug = log.isEnabledFor(logging.DEBUG)
+    log.debug("Starting shift calculation for %04d-%02d", year, month)
 
     people_map = _load_people_map()
-    print(f"DEBUG: Loaded {len(people_map)} people from personnel.csv.")
+    log.debug("Loaded %d people from personnel.csv.", len(people_map))
     if not people_map:
-        print("DEBUG: ERROR - personnel.csv is empty or could not be loaded. Aborting.")
+        log.debug("personnel.csv is empty or could not be loaded. Aborting.")
         return {"dates": [], "by_watch": {}, "counters": {}}
-
-    path = Path("logs") / f"ship_status_{year:04d}_{month:02d}.csv"
-    print(f"DEBUG: Attempting to load ship status from: {path}")
+    eligible = _eligible_by_watch(people_map)
+    # AF weekday-only roles (Executive Officer/DPO) are a per-person fact: split once per month
+    af_weekday_only, af_regular = {}, {}
+    for rid, d in eligible["ΑΦ"].items():
+        weekday_only = _DUTY_FLAGS[people_map[rid]["duty_id"]] & _WEEKDAY_ONLY
+        (af_weekday_only if weekday_only else af_regular)[rid] = d
+
+    path = log_path("ship_status", year, month)
     if not path.exists():
-        print(f"DEBUG: ERROR - Ship status file not found. Aborting.")
+        log.debug("Ship status file not found: %s. Aborting.", path)
         return {"dates": [], "by_watch": {w: {} for w in WATCH_TYPES}, "counters": {}}
 
     ship = pd.read_csv(path, dtype=str, encoding='utf-8-sig').fillna("")
     dates = sorted([d for d in ship["date"].astype(str).tolist() if d])
-    print(f"DEBUG: Found {len(dates)} days to process in ship status file.")
+    # date -> status of its first row in the file, built once instead of a column scan per day
+    status_by_date = {}
+    for d, st in zip(ship["date"].tolist(), ship["status"].tolist()):
+        status_by_date.setdefault(d, st)
+    log.debug("Found %d days to process in %s.", len(dates), path)
 
     by_watch = {w: {} for w in WATCH_TYPES}
-    counters = {}
-
-    for date_iso in dates:
-        print(f"\n----- PROCESSING DATE: {date_iso} -----")
-        status = ship.loc[ship["date"] == date_iso, "status"].iloc[0]
-        print(f"DEBUG: Ship status is '{status}'.")
+    stats = _MonthCounters(people_map, dates)
+    af_order = _youngest_first(af_regular, people_map, stats)
+    af_order_weekday = _youngest_first(af_weekday_only, people_map, stats)
+    non_af = ["ΥΦ", "ΥΦΜ", "ΒΥΦΜ", "ΒΥΦ"]
+    # each person has one primary shift, so a watch's totals only change through its own heap
+    heaps = {w: _fair_heap(eligible[w], people_map, stats) for w in non_af}
+    month_ctx = {}  # (year, month) strings -> inputs loaded once for every day of that month
+
+    for day_i, date_iso in enumerate(dates):
+        status = status_by_date[date_iso]
         if status.lower().strip() != "in port":
-            print("DEBUG: Status is not 'in port'. Marking as SEA and skipping.")
+            if debug:
+                log.debug("%s: ship status is %r, marking as SEA.", date_iso, status)
             for w in WATCH_TYPES:
                 by_watch[w][date_iso] = "SEA"
             continue
 
-        used_today = set()
-        info = day_availability(date_iso)
-        
-        print("DEBUG: Initial pools from day_availability():")
-        for w, p in info.get("pools", {}).items():
-            print(f"  - Pool '{w}': {len(p)} people.")
-
-        # AF Watch
+        if not stats.valid[day_i]:
+            raise ValueError(f"Invalid date in {path}: {date_iso!r}")
+        used_today = np.zeros(len(stats.rids), bool)
+        y, m, _ = date_iso.split("-")
+        if (y, m) not in month_ctx:
+            month_ctx[y, m] = load_month_frames(y, m)
+        info = day_availability_from_ctx(month_ctx[y, m], date_iso)
+        if debug:
+            log.debug("%s: pool sizes %s", date_iso,
+                      {w: len(p) for w, p in info.get("pools", {}).items()})
+
+        # AF Watch: today's available people, in the month's youngest-first order
         w_af = "ΑΦ"
-        pool_af_all = _primary_pool(info, w_af, people_map, af_mode=True)
-        p_weekday_only = [p for p in pool_af_all if str(p.get("duty", "")).strip() in DUTY_WEEKDAY_ONLY]
-        p_regular      = [p for p in pool_af_all if str(p.get("duty", "")).strip() not in DUTY_WEEKDAY_ONLY]
-        picked_af = None
-
-        for p in _sort_af_youngest_first(p_regular):
-            rid, rk = p["registry_id"], str(p["rank"]).strip()
-            if rid not in used_today and _ok_person_on_date(rid, rk, "", date_iso, counters, weekday_only=False):
-                picked_af = p
-                break
-        
-        if not picked_af:
-            for p in _sort_af_youngest_first(p_weekday_only):
-                rid, rk = p["registry_id"], str(p["rank"]).strip()
-                if rid not in used_today and _ok_person_on_date(rid, rk, "weekday_only", date_iso, counters, weekday_only=True):
-                    picked_af = p
-                    break
+        today, avail = _day_pool(info, w_af, stats, eligible[w_af])
+        ok = _feasible(stats, day_i, used_today) & avail
+        i = _first_in_order(af_order, ok)
+        if i is None and not stats.is_wknd[day_i]:  # weekday-only roles: Mon-Fri
+            i = _first_in_order(af_order_weekday, ok)
 
+        picked_af = None
+        if i is not None:
+            picked_af = dict(today[i], duty=eligible[w_af][stats.rids[i]])
+            stats.assign(i, picked_af, w_af, day_i)
+            used_today[i] = True
+        elif debug:
+            log.debug("%s: no one assigned to %s.", date_iso, w_af)
         by_watch[w_af][date_iso] = picked_af
-        if picked_af:
-            print(f"DEBUG: ==> Assigned {w_af}: {picked_af.get('name')}")
-            rid = picked_af["registry_id"]
-            c = counters.setdefault(rid, {"name": picked_af["name"], "rank": picked_af["rank"], "specialty": picked_af["specialty"], "total":0, "wknd":0, "hol":0, "hol_real":0, "dates":set(), "per_watch":{w:0 for w in WATCH_TYPES}, "hol_watch":{w:0 for w in WATCH_TYPES}})
-            c["total"] += 1; c["per_watch"][w_af] += 1; c["dates"].add(date_iso)
-            if is_weekend(date_iso): c["wknd"] += 1
-            if _is_holiday_like(date_iso): c["hol"] += 1; c["hol_watch"][w_af] += 1
-            if is_holiday(date_iso): c["hol_real"] += 1
-            used_today.add(rid)
-        else:
-            print(f"DEBUG: ==> No one assigned to {w_af}.")
 
         # Other watches
-        for w in ["ΥΦ", "ΥΦΜ", "ΒΥΦΜ", "ΒΥΦ"]:
-            pool_w = _primary_pool(info, w, people_map)
+        for w in non_af:
+            today, avail = _day_pool(info, w, stats, eligible[w])
+            ok = _feasible(stats, day_i, used_today) & avail
+            i = _pick_fair(heaps[w], ok)
             picked = None
-            for p in _sort_fair_non_af(pool_w, counters):
-                rid, rk = p["registry_id"], str(p["rank"]).strip()
-                if rid not in used_today and _ok_person_on_date(rid, rk, "", date_iso, counters):
-                    picked = p
-                    break
+            if i is not None:
+                picked = dict(today[i])
+                stats.assign(i, picked, w, day_i)
+                used_today[i] = True
+            elif debug:
+                log.debug("%s: no one assigned to %s.", date_iso, w)
             by_watch[w][date_iso] = picked
-            if picked:
-                print(f"DEBUG: ==> Assigned {w}: {picked.get('name')}")
-                rid = picked["registry_id"]
-                c = counters.setdefault(rid, {"name": picked["name"], "rank": picked["rank"], "specialty": picked["specialty"], "total":0, "wknd":0, "hol":0, "hol_real":0, "dates":set(), "per_watch":{wt:0 for wt in WATCH_TYPES}, "hol_watch":{wt:0 for wt in WATCH_TYPES}})
-                c["total"] += 1; c["per_watch"][w] += 1; c["dates"].add(date_iso)
-                if is_weekend(date_iso): c["wknd"] += 1
-                if _is_holiday_like(date_iso): c["hol"] += 1; c["hol_watch"][w] += 1
-                if is_holiday(date_iso): c["hol_real"] += 1
-                used_today.add(rid)
-            else:
-                print(f"DEBUG: ==> No one assigned to {w}.")
 
-    print("\n" + "="*50)
-    print(f"DEBUG: CALCULATION COMPLETE. Total personnel with assignments: {len(counters)}")
-    print("="*50 + "\n")
+    counters = stats.as_dict()
+    log.debug("Calculation complete. Personnel with assignments: %d", len(counters))
     return {"dates": dates, "by_watch": by_watch, "counters": counters}
 
 # ------------------------------ Excel exporting ------------------------------
-# (No changes to export logic)
-def _apply_table_borders(ws):
-    thin = Side(border_style="thin", color="000000")
-    border = Border(left=thin, right=thin, top=thin, bottom=thin)
-    for r in range(1, ws.max_row + 1):
-        for c in range(1, ws.max_column + 1):
-            ws.cell(row=r, column=c).border = border
+
+# Shared cell styles (openpyxl style objects are immutable, so one instance serves every cell)
+_GRAY = PatternFill(start_color="00DDDDDD", end_color="00DDDDDD", fill_type="solid")
+_THIN = Side(border_style="thin", color="000000")
+_BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+_BORDERED = "bordered"
+_BORDERED_GRAY = "bordered_gray"
+
+def _new_workbook() -> Workbook:
+    """Write-only workbook with the "bordered" and "bordered_gray" NamedStyles registered once."""
+    wb = Workbook(write_only=True)
+    wb.add_named_style(NamedStyle(name=_BORDERED, border=_BORDER))
+    wb.add_named_style(NamedStyle(name=_BORDERED_GRAY, border=_BORDER, fill=_GRAY))
+    return wb
+
+def _write_table(wb: Workbook, title: str, header: list, rows: list, main_cols: int | None = None,
+                 gray_rows: frozenset = frozenset()) -> None:
+    """
+    Stream one sheet into the write-only workbook wb: header row, then rows (lists,
+    padded to a rectangle). Every cell gets the thin border; body cells use the
+    "bordered" NamedStyle. The first main_cols columns (default: all) form the main
+    table: the autofilter covers them and, on sheet rows in gray_rows (weekends/
+    holidays), their cells use "bordered_gray" instead.
+    """
+    ws = wb.create_sheet(title=title)
+    width = max(len(header), max(map(len, rows), default=0), 1)
+    main_cols = width if main_cols is None else main_cols
+    ws.freeze_panes = "A2"
+    ws.auto_filter.ref = f"A1:{get_column_letter(max(main_cols, 1))}{len(rows) + 1}"
+    cells = [WriteOnlyCell(ws, value=v) for v in list(header) + [None] * (width - len(header))]
+    for cell in cells:
+        cell.border = _BORDER
+    ws.append(cells)
+    for r, row in enumerate(rows, start=2):
+        # one pass per row: pad once, one named style per cell
+        cells = [WriteOnlyCell(ws, value=v) for v in list(row) + [None] * (width - len(row))]
+        shaded = main_cols if r in gray_rows else 0
+        for c, cell in enumerate(cells):
+            cell.style = _BORDERED_GRAY if c < shaded else _BORDERED
+        ws.append(cells)
+
+def _stats_order(count: np.ndarray, rank, name) -> np.ndarray:
+    """
+    Row order for a stats table: highest count first, then rank and name ascending,
+    ties kept in input order. Strings are sorted through their np.unique codes,
+    since lexsort does not take object arrays.
+    """
+    rank_codes = np.unique(np.asarray(rank, dtype=object), return_inverse=True)[1]
+    name_codes = np.unique(np.asarray(name, dtype=object), return_inverse=True)[1]
+    return np.lexsort((name_codes, rank_codes, -np.asarray(count)))
 
 def export_month_schedule_all(year: int, month: int, result=None):
     if result is None:
@@ -249,113 +471,84 @@ def export_month_schedule_all(year: int, month: int, result=None):
     path_watches  = outdir / f"Shifts_{year:04d}-{month:02d}.xlsx"
     path_calendar = outdir / f"Calendar_{year:04d}-{month:02d}.xlsx"
     path_summary  = outdir / f"Monthly_Summary_{year:04d}-{month:02d}.xlsx"
-    gray = PatternFill(start_color="00DDDDDD", end_color="00DDDDDD", fill_type="solid")
     header_map = {"ΑΦ": "AF", "ΥΦ": "YF", "ΥΦΜ": "YFM", "ΒΥΦΜ": "BYFM", "ΒΥΦ": "BYF"}
-
-    with pd.ExcelWriter(path_watches, engine="openpyxl") as xw:
-        for w in WATCH_TYPES:
-            rows = []
-            english_watch_header = header_map.get(w, w)
-            for d in dates:
-                dayname = weekday_name_gr(d)
-                entry = by_watch.get(w, {}).get(d)
-                if entry == "SEA": name = "At Sea"
-                elif entry is None: name = ""
-                else: name = _display_name(entry["rank"], entry["specialty"], entry["name"])
-                rows.append({"Date": d, "Day": dayname, english_watch_header: name})
-            df = pd.DataFrame(rows)
-            df.to_excel(xw, sheet_name=english_watch_header, index=False)
-            ws = xw.book[english_watch_header]
-            ws.freeze_panes = "A2"
-            ws.auto_filter.ref = ws.dimensions
-            for r in range(2, ws.max_row + 1):
-                date_iso = ws[f"A{r}"].value
-                if date_iso and (is_weekend(date_iso) or is_holiday(date_iso)):
-                    for c in range(1, ws.max_column + 1):
-                        ws[f"{get_column_letter(c)}{r}"].fill = gray
-            _apply_table_borders(ws)
-            recs = []
-            for rid, st in counters.items():
-                cnt = st.get("per_watch", {}).get(w, 0)
-                hol = st.get("hol_watch", {}).get(w, 0)
-                if cnt == 0 and hol == 0: continue
-                recs.append({
-                    "Registry No.": rid, "Full Name": st.get("name", ""),
-                    "Rank": st.get("rank", ""), "Specialty": st.get("specialty", ""),
-                    f"Total {english_watch_header}": cnt,
-                    f"{english_watch_header} on holiday/weekend": hol,
-                })
-            df_sum = pd.DataFrame(recs)
-            if not df_sum.empty:
-                df_sum = df_sum.sort_values([f"Total {english_watch_header}", "Rank", "Full Name"], ascending=[False, True, True])
-                start_col = ws.max_column + 2
-                for j, h in enumerate(df_sum.columns, start=start_col): ws.cell(row=1, column=j, value=h)
-                for i, row in enumerate(df_sum.itertuples(index=False), start=2):
-                    for j, val in enumerate(row, start=start_col): ws.cell(row=i, column=j, value=val)
-                _apply_table_borders(ws)
-        recs_all = []
-        for rid, st in counters.items():
-            row = {"Registry No.": rid, "Full Name": st.get("name", ""), "Rank": st.get("rank", ""), "Specialty": st.get("specialty", "")}
-            total = 0
-            for w in WATCH_TYPES:
-                c = st.get("per_watch", {}).get(w, 0)
-                row[header_map.get(w, w)] = c
-                total += c
-            row["Total"] = total
-            row["Total Holidays/Weekends"] = st.get("hol", 0)
-            recs_all.append(row)
-        df_all_cols = ["Registry No.", "Full Name", "Rank", "Specialty"] + [header_map.get(w, w) for w in WATCH_TYPES] + ["Total", "Total Holidays/Weekends"]
-        df_all = pd.DataFrame(recs_all, columns=df_all_cols)
-        if not df_all.empty:
-            df_all = df_all.sort_values(["Total", "Rank", "Full Name"], ascending=[False, True, True])
-        df_all.to_excel(xw, sheet_name="Statistics (Total)", index=False)
-        ws = xw.book["Statistics (Total)"]
-        ws.freeze_panes = "A2"; ws.auto_filter.ref = ws.dimensions
-        _apply_table_borders(ws)
-
-    with pd.ExcelWriter(path_calendar, engine="openpyxl") as xw:
-        rows = []
+    # weekend/holiday flags once per export; date k sits on sheet row k + 2 in every day table
+    gray_rows = frozenset(r for r, d in enumerate(dates, start=2)
+                          if d and (is_weekend(d) or is_holiday(d)))
+
+    # Day names and per-watch display names, shared by the watch sheets and the calendar
+    day_names = [weekday_name_gr(d) for d in dates]
+    names = {}
+    for w in WATCH_TYPES:
+        col = []
         for d in dates:
-            rec = {"Date": d, "Day": weekday_name_gr(d)}
-            for w in WATCH_TYPES:
-                entry = by_watch.get(w, {}).get(d)
-                if entry == "SEA": name = "At Sea"
-                elif entry is None: name = ""
-                else: name = _display_name(entry["rank"], entry["specialty"], entry["name"])
-                rec[header_map.get(w, w)] = name
-            rows.append(rec)
-        df_cols = ["Date", "Day"] + [header_map.get(w, w) for w in WATCH_TYPES]
-        df = pd.DataFrame(rows, columns=df_cols)
-        df.to_excel(xw, sheet_name="Calendar", index=False)
-        ws = xw.book["Calendar"]
-        ws.freeze_panes = "A2"; ws.auto_filter.ref = ws.dimensions
-        for r in range(2, ws.max_row + 1):
-            date_iso = ws[f"A{r}"].value
-            if date_iso and (is_weekend(date_iso) or is_holiday(date_iso)):
-                for c in range(1, ws.max_column + 1):
-                    ws[f"{get_column_letter(c)}{r}"].fill = PatternFill(start_color="00DDDDDD", end_color="00DDDDDD", fill_type="solid")
-        _apply_table_borders(ws)
-
-    with pd.ExcelWriter(path_summary, engine="openpyxl") as xw:
-        recs = []
-        for rid, st in counters.items():
-            row = {"Registry No.": rid, "Full Name": st.get("name", ""), "Rank": st.get("rank", ""), "Specialty": st.get("specialty", "")}
-            total = 0
-            for w in WATCH_TYPES:
-                c = st.get("per_watch", {}).get(w, 0)
-                row[header_map.get(w, w)] = c
-                total += c
-            row["Total"] = total
-            row["Total Holidays/Weekends"] = st.get("hol", 0)
-            recs.append(row)
-        df_cols_summary = ["Registry No.", "Full Name", "Rank", "Specialty"] + [header_map.get(w, w) for w in WATCH_TYPES] + ["Total", "Total Holidays/Weekends"]
-        df = pd.DataFrame(recs, columns=df_cols_summary)
-        if not df.empty:
-            df = df.sort_values(["Total", "Rank", "Full Name"], ascending=[False, True, True])
-        df.to_excel(xw, sheet_name="Summary", index=False)
-        ws = xw.book["Summary"]
-        ws.freeze_panes = "A2"; ws.auto_filter.ref = ws.dimensions
-        _apply_table_borders(ws)
+            entry = by_watch.get(w, {}).get(d)
+            if entry == "SEA": name = "At Sea"
+            elif entry is None: name = ""
+            else: name = _display_name(entry["rank"], entry["specialty"], entry["name"])
+            col.append(name)
+        names[w] = col
+
+    # Per-person columns pulled out of counters once, shared by every stats table
+    # (_MonthCounters.as_dict fills every field, with per_watch/hol_watch for all watches)
+    sts = list(counters.values())
+    person_cols = {
+        "Registry No.": list(counters),
+        "Full Name": [st["name"] for st in sts],
+        "Rank": [st["rank"] for st in sts],
+        "Specialty": [st["specialty"] for st in sts],
+    }
+    per_w = {w: np.array([st["per_watch"][w] for st in sts], dtype=np.int64) for w in WATCH_TYPES}
+    hol_w = {w: np.array([st["hol_watch"][w] for st in sts], dtype=np.int64) for w in WATCH_TYPES}
+
+    # Totals across all watches, written as "Statistics (Total)" and as "Summary"
+    df_all = pd.DataFrame({
+        **person_cols,
+        **{header_map.get(w, w): per_w[w] for w in WATCH_TYPES},
+        "Total": sum(per_w.values(), np.zeros(len(sts), np.int64)),
+        "Total Holidays/Weekends": np.array([st["hol"] for st in sts], dtype=np.int64),
+    })
+    df_all_cols = list(df_all.columns)
+    df_all = df_all.iloc[_stats_order(df_all["Total"].to_numpy(), person_cols["Rank"],
+                                      person_cols["Full Name"])]
+    # one 2-D conversion to plain Python values (object dtype unboxes the numpy ints)
+    all_rows = df_all.to_numpy(dtype=object).tolist()
+
+    # All three files are streamed through write-only workbooks (no in-memory cell grid)
+    wb = _new_workbook()
+    for w in WATCH_TYPES:
+        english_watch_header = header_map.get(w, w)
+        header = ["Date", "Day", english_watch_header] if dates else []
+        rows = [[d, dn, nm] for d, dn, nm in zip(dates, day_names, names[w])]
+        main_cols = len(header)  # gray rows cover the watch table, not the summary
+        df_sum = pd.DataFrame({
+            **person_cols,
+            f"Total {english_watch_header}": per_w[w],
+            f"{english_watch_header} on holiday/weekend": hol_w[w],
+        })
+        df_sum = df_sum[(per_w[w] != 0) | (hol_w[w] != 0)]
+        if not df_sum.empty:
+            df_sum = df_sum.iloc[_stats_order(df_sum[f"Total {english_watch_header}"].to_numpy(),
+                                              df_sum["Rank"].to_numpy(), df_sum["Full Name"].to_numpy())]
+            # summary panel to the right of the watch table, one empty column between
+            header = header + [None] + list(df_sum.columns)
+            sum_rows = df_sum.to_numpy(dtype=object).tolist()
+            rows = [(rows[k] if k < len(rows) else [None] * main_cols) + [None]
+                    + (sum_rows[k] if k < len(sum_rows) else [])
+                    for k in range(max(len(rows), len(sum_rows)))]
+        _write_table(wb, english_watch_header, header, rows, max(main_cols, 1), gray_rows)
+    _write_table(wb, "Statistics (Total)", df_all_cols, all_rows)
+    wb.save(path_watches)
+
+    wb = _new_workbook()
+    cal_rows = [list(r) for r in zip(dates, day_names, *(names[w] for w in WATCH_TYPES))]
+    _write_table(wb, "Calendar", ["Date", "Day"] + [header_map.get(w, w) for w in WATCH_TYPES],
+                 cal_rows, gray_rows=gray_rows)
+    wb.save(path_calendar)
+
+    wb = _new_workbook()
+    _write_table(wb, "Summary", df_all_cols, all_rows)
+    wb.save(path_summary)
 
     return [path_watches, path_calendar, path_summary]
 
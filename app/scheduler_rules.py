@@ -7,11 +7,13 @@
 from __future__ import annotations
 from .i18n_display_mapping import I18N
 from .constants import RANKS, SPECIALTIES, DUTIES
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
+import os
 import pandas as pd
 
-LOGS_DIR = Path("logs")
+from .store import LOGS_DIR, log_name
 
 # --------------------------- Rank constraints -------------------------------
 
@@ -48,26 +50,65 @@ def _load_csv(path: Path) -> pd.DataFrame:
         return pd.read_csv(path, dtype=str).fillna("")
     return pd.DataFrame()
 
+def _file_stamp(path: Path):
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+@lru_cache(maxsize=32)
+def _holiday_set(path: str, stamp) -> frozenset[str]:
+    """
+    Dates listed in one monthly holidays file, parsed once. The file's (mtime_ns, size)
+    stamp is part of the cache key, so an edited file is read again.
+    """
+    hol = _load_csv(Path(path))
+    if hol.empty or "date" not in hol.columns:
+        return frozenset()
+    return frozenset(hol["date"].astype(str))
+
 def is_holiday(date_iso: str) -> bool:
     y, m, _ = date_iso.split("-")
-    hol = _load_csv(LOGS_DIR / f"holidays_{int(y):04d}_{int(m):02d}.csv")
-    if hol.empty or "date" not in hol.columns:
-        return False
-    return date_iso in set(hol["date"].astype(str))
+    path = LOGS_DIR / log_name("holidays", y, m)
+    return date_iso in _holiday_set(os.path.abspath(path), _file_stamp(path))
+
+@lru_cache(maxsize=512)
+def _parse_date(date_iso: str) -> date:
+    """
+    Calendar date of an ISO string. Strict YYYY-MM-DD (what the logs store) is sliced
+    into ints directly; anything else goes through datetime.fromisoformat as before.
+    """
+    s = date_iso
+    if len(s) == 10 and s[4] == s[7] == "-" and s.isascii() and (s[:4] + s[5:7] + s[8:]).isdigit():
+        return date(int(s[:4]), int(s[5:7]), int(s[8:]))
+    return datetime.fromisoformat(s).date()
+
+_WEEKDAY_NAMES = ("MONDAY","TUESDAY","WEDNESDAY","THURSDAY","FRIDAY","SATURDAY","SUNDAY")
 
 def weekday_name_gr(date_iso: str) -> str:
     # Return uppercase English weekday name
-    d = datetime.fromisoformat(date_iso).date()
-    names = ["MONDAY","TUESDAY","WEDNESDAY","THURSDAY","FRIDAY","SATURDAY","SUNDAY"]
-    return names[d.weekday()]
+    return _WEEKDAY_NAMES[_parse_date(date_iso).weekday()]
 
 def is_weekend(date_iso: str) -> bool:
-    d = datetime.fromisoformat(date_iso).date()
-    return d.weekday() >= 5  # 5=Saturday, 6=Sunday
+    return _parse_date(date_iso).weekday() >= 5  # 5=Saturday, 6=Sunday
 
 def is_weekday(date_iso: str) -> bool:
     return not is_weekend(date_iso)
 
+def _ordinal(date_iso: str) -> int:
+    return _parse_date(date_iso).toordinal()
+
+def two_day_gap_ok_ord(prev_ordinals, day_ordinal: int) -> bool:
+    """
+    two_day_gap_ok on day ordinals (date.toordinal()): prev_ordinals is any iterable
+    of ints, e.g. a NumPy int array. No date parsing, just integer comparisons.
+    """
+    for p in prev_ordinals:
+        if abs(day_ordinal - p) < 3:
+            return False
+    return True
+
 def two_day_gap_ok(prev_assigned_dates: set[str], date_iso: str) -> bool:
     """
     Enforce at least two empty days between duties:
@@ -75,12 +116,7 @@ def two_day_gap_ok(prev_assigned_dates: set[str], date_iso: str) -> bool:
     """
     if not prev_assigned_dates:
         return True
-    d = datetime.fromisoformat(date_iso).date()
-    for s in prev_assigned_dates:
-        dd = datetime.fromisoformat(s).date()
-        if abs((d - dd).days) < 3:
-            return False
-    return True
+    return two_day_gap_ok_ord(map(_ordinal, prev_assigned_dates), _ordinal(date_iso))
 
 # Bilingual helper
 try:
@@ -7,9 +7,12 @@
 
 from __future__ import annotations
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 import pandas as pd
-from .constants import RANKS
+from .constants import RANKS, OFFICER_RANKS
 from .i18n_display_mapping import I18N
+from .store import log_path
 
 # Seniority: lower index = more senior
 SENIORITY_ORDER = {rank: i for i, rank in enumerate(RANKS)}
@@ -22,12 +25,24 @@ def _seniority_key(rank: str) -> int:
 
 # Valid in-port watch types (fixed)
 WATCH_TYPES = ["ΑΦ", "ΥΦ", "ΥΦΜ", "ΒΥΦΜ", "ΒΥΦ"]
+NON_OFFICER_WATCHES = ("ΥΦ", "ΥΦΜ", "ΒΥΦΜ", "ΒΥΦ")
+
+@lru_cache(maxsize=64)
+def _read_csv_cached(path: str, stamp: tuple) -> pd.DataFrame:
+    # Ensure this line has the encoding specified
+    return pd.read_csv(path, dtype=str, encoding='utf-8-sig').fillna("")
 
 def _load_csv(path: str) -> pd.DataFrame:
-    if os.path.exists(path):
-        # Ensure this line has the encoding specified
-        return pd.read_csv(path, dtype=str, encoding='utf-8-sig').fillna("")
-    return pd.DataFrame()
+    """
+    Parsed CSV (all str, blanks as ""), or an empty frame if the file is missing.
+    Parses are cached on the file's (mtime_ns, size), so the ~30 day_availability calls
+    of one month read each file once. The frame is shared: callers must not mutate it.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return pd.DataFrame()
+    return _read_csv_cached(os.path.abspath(path), (st.st_mtime_ns, st.st_size))
 
 def _pick_first_col(df: pd.DataFrame, candidates: list[str]) -> str | None:
     for c in candidates:
@@ -35,18 +50,61 @@ def _pick_first_col(df: pd.DataFrame, candidates: list[str]) -> str | None:
             return c
     return None
 
+@dataclass
+class MonthCtx:
+    """One month's scheduling inputs, loaded once and shared by every day of the month."""
+    status: pd.DataFrame | None   # ship status indexed by date; None if missing/invalid
+    people: pd.DataFrame
+    reg_col: str | None                 # registry number column of people (None if missing)
+    name_col: str | None                # full name column of people (None if missing)
+    leave: dict[str, frozenset[str]]    # date -> registry ids on leave
+    cannot: dict[str, frozenset[str]]   # date -> registry ids unavailable
+    prefer: dict[str, frozenset[str]]   # date -> registry ids preferring duty
+
+def _date_to_ids(df: pd.DataFrame) -> dict[str, frozenset[str]]:
+    """date -> registry ids of one monthly log, grouped once instead of a scan per date."""
+    if df.empty or "date" not in df.columns:
+        return {}
+    rc = _pick_first_col(df, ["registry_id", "registry_number", "service_number"])
+    if not rc:
+        return {}
+    return {d: frozenset(g.astype(str)) for d, g in df.groupby("date", sort=False)[rc]}
+
+def load_month_frames(y: str, m: str) -> MonthCtx:
+    """Load the ship status, personnel registry and leave/cannot/prefer logs of month y-m."""
+    status_df = _load_csv(log_path("ship_status", y, m))
+    if status_df.empty or "date" not in status_df.columns or "status" not in status_df.columns:
+        status = None
+    else:
+        status = status_df.set_index("date")
+    people = _load_csv("data/personnel.csv")
+    return MonthCtx(
+        status=status,
+        people=people,
+        reg_col=_pick_first_col(people, ["registry_number", "registry_id", "service_number"]),
+        name_col=_pick_first_col(people, ["name", "fullname"]),
+        leave=_date_to_ids(_load_csv(log_path("daily_leave", y, m))),
+        cannot=_date_to_ids(_load_csv(log_path("daily_cannot", y, m))),
+        prefer=_date_to_ids(_load_csv(log_path("daily_prefer", y, m))),
+    )
+
 def day_availability(date_str: str) -> dict:
     """
     Prepare availability pools for a specific date (YYYY-MM-DD).
     Returns a dict with ship_status, exclusions, and pools per watch type.
     """
     y, m, _ = date_str.split("-")
+    return day_availability_from_ctx(load_month_frames(y, m), date_str)
 
+def day_availability_from_ctx(ctx: MonthCtx, date_str: str) -> dict:
+    """
+    day_availability on already loaded month inputs (see load_month_frames), so a
+    whole-month schedule loads its files once instead of once per date.
+    """
     # 1) Ship status (flat files under ./logs)
-    status_df = _load_csv(f"logs/ship_status_{y}_{m}.csv")
-    if status_df.empty or "date" not in status_df.columns or "status" not in status_df.columns:
+    status_df = ctx.status
+    if status_df is None:
         return {"error": "A (correct) ship status file for the month was not found."}
-    status_df = status_df.set_index("date")
     if date_str not in status_df.index:
         return {"error": f"There is no ship status entry for {date_str}."}
     ship_status = str(status_df.loc[date_str, "status"]).strip()
@@ -59,69 +117,43 @@ def day_availability(date_str: str) -> dict:
         }
 
     # 2) Personnel registry (harmonize columns)
-    people = _load_csv("data/personnel.csv")
+    people = ctx.people
     if people.empty:
         return {"error": "The personnel registry is empty."}
-    reg_col = _pick_first_col(people, ["registry_number", "registry_id", "service_number"])
+    reg_col, name_col = ctx.reg_col, ctx.name_col
     if not reg_col:
         return {"error": "The registry number column (registry_number) is missing."}
-    name_col = _pick_first_col(people, ["name", "fullname"])
     if not name_col:
          return {"error": "The full name column (name/fullname) is missing."}
 
     # 3) Monthly logs (leave / cannot / prefer)
-    leave_df  = _load_csv(f"logs/daily_leave_{y}_{m}.csv")
-    cannot_df = _load_csv(f"logs/daily_cannot_{y}_{m}.csv")
-    prefer_df = _load_csv(f"logs/daily_prefer_{y}_{m}.csv")
-
-    def _ids_on_day(df: pd.DataFrame) -> set[str]:
-        if df.empty or "date" not in df.columns:
-            return set()
-        rc = _pick_first_col(df, ["registry_id", "registry_number", "service_number"])
-        if not rc:
-            return set()
-        return set(df.loc[df["date"] == date_str, rc].astype(str).tolist())
-
-    leave_ids  = _ids_on_day(leave_df)
-    cannot_ids = _ids_on_day(cannot_df)
-    prefer_ids = _ids_on_day(prefer_df)
-
-    # 4) Build pools by eligibility (rank rules)
-    pools = {wt: [] for wt in WATCH_TYPES}
-    officer_ranks = {
-        "Commander","Commander (M)","Lieutenant Commander","Lieutenant Commander (M)",
-        "Lieutenant","Lieutenant (M)","Lieutenant (E)",
-        "Ensign","Ensign (M)","Ensign (E)"
-    }
-    
-    for _, row in people.iterrows():
-        reg = str(row[reg_col]).strip()
-        if not reg or reg in leave_ids or reg in cannot_ids:
-            continue
-
-        rk  = str(row["rank"]).strip()
-        sp  = str(row["specialty"]).strip()
-        nm  = str(row[name_col]).strip()
-
-        if rk in officer_ranks:
-            eligible = ["ΑΦ"]
-        elif rk == "Warrant Officer":
-            eligible = ["ΑΦ","ΥΦ","ΥΦΜ","ΒΥΦΜ","ΒΥΦ"]
-        else:
-            eligible = ["ΥΦ","ΥΦΜ","ΒΥΦΜ","ΒΥΦ"]
-
-        for wt in eligible:
-            pools[wt].append({
-                "registry_id": reg,
-                "name": nm,
-                "rank": rk,
-                "specialty": sp,
-                "preferred": (reg in prefer_ids)
-            })
-
-    # Sort pools by seniority then name
-    for w in pools:
-        pools[w].sort(key=lambda p: (_seniority_key(p["rank"]), str(p["name"])))
+    leave_ids  = ctx.leave.get(date_str, frozenset())
+    cannot_ids = ctx.cannot.get(date_str, frozenset())
+    prefer_ids = ctx.prefer.get(date_str, frozenset())
+
+    # 4) Build pools by eligibility (rank rules), column-wise over the registry
+    reg = people[reg_col].astype(str).str.strip()
+    keep = reg.ne("") & ~reg.isin(leave_ids | cannot_ids)
+    reg = reg[keep]
+    base = pd.DataFrame({
+        "registry_id": reg,
+        "name": people.loc[keep, name_col].astype(str).str.strip(),
+        "rank": people.loc[keep, "rank"].astype(str).str.strip(),
+        "specialty": people.loc[keep, "specialty"].astype(str).str.strip(),
+        "preferred": reg.isin(prefer_ids),
+    })
+    # Sort by seniority then name once (stable: file order breaks ties). Ranks are
+    # already stripped, so the integer key is a plain dict map (unknown ranks last).
+    seniority = base["rank"].map(SENIORITY_ORDER).fillna(10_000).astype(int)
+    base = base.assign(__k=seniority).sort_values(["__k", "name"], kind="stable").drop(columns="__k")
+
+    # Officers: AF only; Warrant Officers: every watch; everyone else: all but AF
+    is_officer = base["rank"].isin(OFFICER_RANKS)
+    is_warrant = base["rank"].eq("Warrant Officer")
+    pools = {"ΑΦ": base[is_officer | is_warrant].to_dict(orient="records")}
+    non_af = base[~is_officer]
+    for wt in NON_OFFICER_WATCHES:
+        pools[wt] = non_af.to_dict(orient="records")
 
     return {
         "date": date_str,
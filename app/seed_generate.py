@@ -11,16 +11,21 @@
 # -----------------------------------------------------------------------------
 
 from __future__ import annotations
+import csv
+import os
 from pathlib import Path
-import pandas as pd
 
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
 
+# Fields shared by every seeded person
+ADDRESS = "Salamis Naval Base"
+NOTES = "—"
+
 def row(idx, reg, name, rank, spec, duty, primary, alt):
     """Build one person row with generic 'general' fields filled."""
-    address = "Salamis Naval Base"
-    phone = f"2106{800000+idx:06d}"
+    month = idx % 12 + 1
+    day = "28" if month == 2 else "30"
     return {
         "registry_number": reg,
         "name": name,
@@ -32,12 +37,12 @@ def row(idx, reg, name, rank, spec, duty, primary, alt):
         "at_sea_shift": "",
         "height": str(170 + (idx % 15)),   # 170-184
         "weight": str(70 + (idx % 20)),    # 70-89
-        "address": address,
-        "phone": phone,
+        "address": ADDRESS,
+        "phone": f"2106{800000+idx:06d}",
         "marital_status": "Married" if idx % 3 == 0 else "Single",
         "children": str(idx % 3),
-        "pye_expiration": f"2027-{(idx%12)+1:02d}-{"28" if (idx%12)+1==2 else "30"}",
-        "notes": "—",
+        "pye_expiration": f"2027-{month:02d}-{day}",
+        "notes": NOTES,
     }
 
 def main():
@@ -122,17 +127,15 @@ def main():
     i+=1; people.append(row(i,"PN-3404","Nikolas Kapetanos","Sailor","SIG","NK/Markings","BYF","YF"))
     i+=1; people.append(row(i,"PN-3405","Filippos Diacheiristakis","Sailor","ADMIN","Assistant Supply","BYF","YF"))
 
-    # Assemble DataFrame
-    df = pd.DataFrame(people)
+    # Write rows straight to CSV (missing fields left empty)
     cols = ["registry_number","name","rank","specialty","duty","primary_shift","alt_shift","at_sea_shift",
             "height","weight","address","phone","marital_status","children","pye_expiration","notes"]
-    for c in cols:
-        if c not in df.columns: df[c] = ""
-    df = df[cols]
-
     out = DATA_DIR / "personnel.csv"
-    df.to_csv(out, index=False, encoding="utf-8-sig")
-    print(f"✅ Personnel seed created: {out} ({len(df)} records)")
+    with out.open("w", newline="", encoding="utf-8-sig") as f:
+        w = csv.DictWriter(f, fieldnames=cols, restval="", lineterminator=os.linesep)
+        w.writeheader()
+        w.writerows(people)
+    print(f"✅ Personnel seed created: {out} ({len(people)} records)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
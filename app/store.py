@@ -1,6 +1,8 @@
 # store.py
 # Centralized data loading and saving utilities.
 
+import csv
+import os
 import pandas as pd
 from pathlib import Path
 
@@ -8,11 +10,35 @@ from pathlib import Path
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
 
+# Monthly logs: logs/<kind>_YYYY_MM.csv. They stay as CSV: the scheduler, exports and
+# GUI read them directly and users open them by hand. Every reader and writer builds
+# the names through log_name/log_path, so the format is defined here only.
+LOGS_DIR = Path("logs")
+LOG_EXT = ".csv"
+
+def log_name(kind: str, year, month) -> str:
+    """File name of a monthly log, e.g. ship_status_2025_09.csv."""
+    return f"{kind}_{int(year):04d}_{int(month):02d}{LOG_EXT}"
+
+def log_path(kind: str, year, month) -> Path:
+    """Path of a monthly log under logs/."""
+    return LOGS_DIR / log_name(kind, year, month)
+
+def _csv_value(v):
+    # Missing values (None / NaN / NA) are written as empty fields, like DataFrame.to_csv.
+    return v if isinstance(v, str) or not pd.isna(v) else ""
+
 def save_to_csv(records: list[dict], name: str) -> Path:
-    """Save a list of dictionaries to a CSV in the data/ directory."""
+    """
+    Save a list of dictionaries to a CSV in the data/ directory. Columns are the
+    records' keys in first-seen order; a record without a key leaves its field empty.
+    """
     path = DATA_DIR / name
-    df = pd.DataFrame(records)
-    df.to_csv(path, index=False, encoding="utf-8-sig")
+    fields = list(dict.fromkeys(k for r in records for k in r))
+    with path.open("w", newline="", encoding="utf-8-sig") as f:
+        w = csv.writer(f, lineterminator=os.linesep)
+        w.writerow(fields)
+        w.writerows([_csv_value(r.get(k, "")) for k in fields] for r in records)
     return path
 
 def load_csv(name: str) -> pd.DataFrame: